@@ -0,0 +1,214 @@
+"""
+Scaling benchmark of the pipeline stages on synthetic data
+
+Runs build_graph, build_wind_adjacency_matrix, compute_hermitian_random_walk_laplacian,
+build_pygsp_graph and visualize_pygsp_graph for each size N on seeded synthetic
+districts (generate_synthetic_wind_data), records wall time and peak traced memory
+per stage in a JSON results file and optionally compares them against a baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 100 1000 5000
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+import numpy as np
+import scipy
+from scipy.sparse.linalg import ArpackNoConvergence
+from src.generate_synthetic_wind_data import generate_synthetic_wind_data
+
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+DEFAULT_SIZES = [100, 500, 1000, 5000, 10000, 50000]
+STAGES = ['build_graph', 'build_wind_adjacency_matrix', 'compute_hermitian_random_walk_laplacian',
+          'build_pygsp_graph', 'visualize_pygsp_graph']
+# Above this size the spectral stages compute k modes instead of the full dense spectrum
+FULL_SPECTRUM_MAX_N = 2000
+PARTIAL_SPECTRUM_K = 10
+# Low-frequency modes, as in the pipeline. ARPACK does not converge on the near-zero
+# eigenvalue cluster of the synthetic wind graphs, so the timing includes its fallback
+PARTIAL_SPECTRUM_WHICH = 'SA'
+
+
+def measure(function):
+    """
+    Run function, return (result, wall time in s, peak traced memory in MB)
+    Its output is discarded
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function()
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, wall, peak / 2**20
+
+
+def run_size(n, seed, stages, plot_dir):
+    """
+    Run the pipeline stages on n synthetic districts, one record per stage
+    A failing stage is recorded and the stages depending on it are skipped
+    """
+    from src.build_graph import build_graph
+    from src.build_wind_adjacency_matrix import build_wind_adjacency_matrix
+    from src.compute_hermitian_random_walk_laplacian import compute_hermitian_random_walk_laplacian
+    from src.build_pygsp_graph import build_pygsp_graph
+    from src.visualize_pygsp_graph import visualize_pygsp_graph
+
+    df, coordinates = generate_synthetic_wind_data(n, seed=seed)
+    full_spectrum = n <= FULL_SPECTRUM_MAX_N
+    state = {}
+    pipeline = {
+        'build_graph': lambda: build_graph(df, coordinates, radius_km=100, angle_segment_size=20),
+        'build_wind_adjacency_matrix': lambda: build_wind_adjacency_matrix(
+            df, state['build_graph'], coordinates, angle_segment_size=20, sparse=True
+        ),
+        'compute_hermitian_random_walk_laplacian': lambda: compute_hermitian_random_walk_laplacian(
+            state['build_wind_adjacency_matrix'][0], q=0.01, verbose=False,
+            k=None if full_spectrum else PARTIAL_SPECTRUM_K,
+            which=PARTIAL_SPECTRUM_WHICH, output_dir=None
+        ),
+        'build_pygsp_graph': lambda: build_pygsp_graph(
+            *state['build_wind_adjacency_matrix'], coordinates,
+            svd_method='full' if full_spectrum else 'randomized',
+            svd_rank=None if full_spectrum else PARTIAL_SPECTRUM_K
+        ),
+        'visualize_pygsp_graph': lambda: visualize_pygsp_graph(
+            state['build_pygsp_graph'], state['build_wind_adjacency_matrix'][1],
+            output_file=Path(plot_dir) / f"graph_{n}.png", preview=True
+        ),
+    }
+    dependencies = {
+        'build_wind_adjacency_matrix': ['build_graph'],
+        'compute_hermitian_random_walk_laplacian': ['build_wind_adjacency_matrix'],
+        'build_pygsp_graph': ['build_wind_adjacency_matrix'],
+        'visualize_pygsp_graph': ['build_pygsp_graph'],
+    }
+    # Requested stages and the stages they depend on
+    needed = set(stages)
+    for stage in reversed(STAGES):
+        if stage in needed:
+            needed.update(dependencies.get(stage, []))
+    records = []
+
+    def record_failure(stage, status):
+        records.append({'n': n, 'stage': stage, 'status': status})
+        print(f"N={n:>6}  {stage:<42} {status}")
+
+    for stage in STAGES:
+        if stage not in needed:
+            continue
+        missing = [d for d in dependencies.get(stage, []) if state.get(d) is None]
+        if missing:
+            record_failure(stage, f"skipped: {missing[0]} failed")
+            continue
+        try:
+            state[stage], wall, peak_mb = measure(pipeline[stage])
+        except ArpackNoConvergence as e:
+            state[stage] = None
+            record_failure(stage, f"not converged: {e}")
+            continue
+        except Exception as e:
+            state[stage] = None
+            record_failure(stage, f"error: {e}")
+            continue
+        if stage == 'build_pygsp_graph' and state[stage] is None:
+            # build_pygsp_graph reports its own failures and returns None
+            record_failure(stage, "error: no graph returned")
+            continue
+        record = {'n': n, 'stage': stage, 'status': 'ok', 'wall_s': wall, 'peak_mb': peak_mb}
+        if stage == 'compute_hermitian_random_walk_laplacian':
+            # Solver that produced the modes, and whether it converged
+            spectrum_info = state[stage]['spectrum_info']
+            record['solver'] = spectrum_info['method']
+            record['fallback_from'] = spectrum_info.get('fallback_from')
+            if not spectrum_info['converged']:
+                record['status'] = f"not converged: {spectrum_info['method']} residual {spectrum_info['residual']:.3g}"
+        if stage == 'build_graph':
+            record['edges'] = sum(len(edges) for edges in state[stage].values())
+        elif stage == 'build_wind_adjacency_matrix':
+            record['nnz'] = int(state[stage][0].nnz)
+        if stage in stages:
+            records.append(record)
+            status = '' if record['status'] == 'ok' else f"  {record['status']}"
+            print(f"N={n:>6}  {stage:<42} {wall:9.3f} s  {peak_mb:9.1f} MB{status}")
+    return records
+
+
+def compare_to_baseline(results, baseline, tolerance, min_wall_s=0.05):
+    """
+    Records of results whose wall time or peak memory exceed the baseline by more
+    than tolerance (relative); wall time differences below min_wall_s are noise
+    """
+    reference = {(r['n'], r['stage']): r for r in baseline['results'] if r.get('status') == 'ok'}
+    regressions = []
+    for record in results['results']:
+        base = reference.get((record['n'], record['stage']))
+        if base is None or record.get('status') != 'ok':
+            continue
+        for metric, floor in (('wall_s', min_wall_s), ('peak_mb', 1.0)):
+            if record[metric] > base[metric] * (1 + tolerance) and record[metric] - base[metric] > floor:
+                regressions.append({
+                    'n': record['n'], 'stage': record['stage'], 'metric': metric,
+                    'baseline': base[metric], 'current': record[metric],
+                    'ratio': record[metric] / base[metric] if base[metric] else float('inf')
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, default=None,
+                        help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', type=Path, default=None, help="results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="relative slowdown/memory growth flagged as a regression")
+    args = parser.parse_args(argv)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'seed': args.seed,
+            'sizes': args.sizes,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'platform': platform.platform(),
+        },
+        'results': []
+    }
+    with tempfile.TemporaryDirectory() as plot_dir:
+        for n in args.sizes:
+            results['results'].extend(run_size(n, args.seed, args.stages, plot_dir))
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            results['regressions'] = compare_to_baseline(results, json.load(f), args.tolerance)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    for regression in results.get('regressions', []):
+        print(f"REGRESSION N={regression['n']} {regression['stage']} {regression['metric']}: "
+              f"{regression['baseline']:.3f} -> {regression['current']:.3f} (x{regression['ratio']:.2f})")
+    return 1 if results.get('regressions') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
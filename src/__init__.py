@@ -0,0 +1,7 @@
+"""
+Wind graphs of Indian districts: geocoding, direction-aware wind adjacency,
+Hermitian random walk Laplacian spectra and PyGSP plots
+
+Every module defines the function it is named after, the public functions are
+exported lazily by src.api. Command line: python -m src --help
+"""
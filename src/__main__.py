@@ -0,0 +1,172 @@
+"""
+Command line interface, run from the project root:
+
+    python -m src geocode                  resolve district coordinates (cache, gazetteer, Nominatim)
+    python -m src graph                    build the geometric city graph (stage cache)
+    python -m src adjacency                build the wind adjacency and save it to output/wind_adjacency
+    python -m src spectrum --k 20          Hermitian Laplacian spectrum of the saved adjacency
+    python -m src plot --preview           PyGSP plot of the saved adjacency
+    python -m src run [--headless]         whole pipeline (main.main)
+
+Each command only imports what it needs: spectrum reads the saved adjacency with
+numpy/scipy only, plot is the only command importing PyGSP and matplotlib.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_FILE = PROJECT_ROOT / "data" / "wind_data.xlsx"
+ADJACENCY_DIR = PROJECT_ROOT / "output" / "wind_adjacency"
+logger = logging.getLogger(__name__)
+# Same stage parameters as main.main, so both share the stage cache
+GRAPH_PARAMS = {'radius_km': 100, 'angle_segment_size': 20}
+ADJACENCY_PARAMS = {'angle_segment_size': 20, 'sparse': True}
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    geocode = commands.add_parser('geocode', help="resolve district coordinates")
+    geocode.add_argument('--data-file', type=Path, default=DATA_FILE)
+    geocode.add_argument('--gazetteer', type=Path, default=None, help="offline gazetteer file")
+    geocode.add_argument('--offline', action='store_true', help="no online geocoding")
+    geocode.set_defaults(handler=_geocode)
+
+    for name, handler, help_text in (('graph', _graph, "build the city graph"),
+                                     ('adjacency', _adjacency, "build and save the wind adjacency")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('--data-file', type=Path, default=DATA_FILE)
+        command.add_argument('--offline', action='store_true', help="no online geocoding")
+        command.add_argument('--n-jobs', type=int, default=1, help="worker processes of build_graph")
+        command.set_defaults(handler=handler)
+    commands.choices['adjacency'].add_argument('--output-dir', type=Path, default=ADJACENCY_DIR)
+
+    spectrum = commands.add_parser('spectrum', help="Hermitian Laplacian spectrum of a saved adjacency")
+    spectrum.add_argument('--adjacency-dir', type=Path, default=ADJACENCY_DIR)
+    spectrum.add_argument('--q', type=float, default=0.01)
+    spectrum.add_argument('--k', type=int, default=None, help="number of eigenpairs (default: all)")
+    spectrum.add_argument('--which', default='SA', choices=['SA', 'LA'])
+    spectrum.add_argument('--sigma', type=float, default=None)
+    spectrum.add_argument('--dtype', default='float64', choices=['float64', 'float32'])
+    spectrum.add_argument('--memory-budget', type=float, default=None,
+                          help="out-of-core mode with this working memory in MB (eigenvectors memory-mapped)")
+    spectrum.add_argument('--output-dir', type=Path, default=PROJECT_ROOT / "output" / "hermitian_rw_results")
+    spectrum.set_defaults(handler=_spectrum)
+
+    plot = commands.add_parser('plot', help="plot a saved adjacency")
+    plot.add_argument('--adjacency-dir', type=Path, default=ADJACENCY_DIR)
+    plot.add_argument('--output-file', type=Path, default=None)
+    plot.add_argument('--mode', default='fast', choices=['fast', 'quality'])
+    plot.add_argument('--preview', action='store_true')
+    plot.add_argument('--max-edges', type=int, default=None)
+    plot.set_defaults(handler=_plot)
+
+    run = commands.add_parser('run', help="whole pipeline")
+    run.add_argument('--headless', action='store_true', help="compute only, no PyGSP graph or plot")
+    run.add_argument('--profile-stage', default=None, help="stage run under cProfile")
+    run.add_argument('--no-trace-memory', action='store_true', help="skip tracemalloc")
+    run.set_defaults(handler=_run)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    return args.handler(args) or 0
+
+
+def _load_places(args):
+    from .load_wind_data import load_wind_data
+    from .fetch_all_coordinates import fetch_all_coordinates
+    df = load_wind_data(args.data_file)
+    coordinates, dataf = fetch_all_coordinates(df, use_cache=True, online_fallback=not args.offline,
+                                               gazetteer=getattr(args, 'gazetteer', None))
+    return coordinates, dataf
+
+
+def _geocode(args):
+    coordinates, _ = _load_places(args)
+    logger.info(f"{len(coordinates)} districts geocoded")
+
+
+def _build_cached_graph(args, coordinates, dataf):
+    from .build_graph import build_graph
+    from .run_cached_stage import run_cached_stage
+    from .encode_graph import encode_graph, decode_graph
+    return run_cached_stage(
+        'graph', lambda: build_graph(dataf, coordinates, n_jobs=args.n_jobs, **GRAPH_PARAMS),
+        inputs=[dataf['District'], coordinates], params=GRAPH_PARAMS,
+        encode=encode_graph, decode=decode_graph
+    )
+
+
+def _graph(args):
+    coordinates, dataf = _load_places(args)
+    graph, key = _build_cached_graph(args, coordinates, dataf)
+    logger.info(f"Graph {key}: {len(graph)} nodes, {sum(len(edges) for edges in graph.values())} edges")
+
+
+def _adjacency(args):
+    import numpy as np
+    from .build_wind_adjacency_matrix import build_wind_adjacency_matrix
+    from .run_cached_stage import run_cached_stage
+    from .save_binary_results import save_binary_results
+    coordinates, dataf = _load_places(args)
+    graph, graph_key = _build_cached_graph(args, coordinates, dataf)
+    wind_columns = ['District', 'Speed (in m/s)', 'Direction (in ° angle)']
+    (adj_matrix, cities), _ = run_cached_stage(
+        'adjacency', lambda: build_wind_adjacency_matrix(dataf, graph, coordinates, **ADJACENCY_PARAMS),
+        inputs=[graph_key, dataf[wind_columns], list(coordinates)], params=ADJACENCY_PARAMS,
+        encode=lambda result: {'adj_matrix': result[0], 'cities': np.array(result[1], dtype=str)},
+        decode=lambda arrays: (arrays['adj_matrix'], [str(city) for city in arrays['cities']])
+    )
+    # (lat, lon) per node, so plot does not need the geocoding stack
+    node_coordinates = np.array([coordinates[city] for city in cities], dtype=float)
+    save_binary_results({'adj_matrix': adj_matrix, 'coordinates': node_coordinates}, args.output_dir,
+                        metadata={'cities': cities})
+    logger.info(f"Adjacency {adj_matrix.shape} ({adj_matrix.nnz} edges) saved to {args.output_dir}")
+
+
+def _load_adjacency(adjacency_dir):
+    from .load_binary_results import load_binary_results
+    saved = load_binary_results(adjacency_dir, mmap_mode=None)
+    return saved['adj_matrix'], saved['cities'], saved['coordinates']
+
+
+def _spectrum(args):
+    import numpy as np
+    from .compute_hermitian_random_walk_laplacian import compute_hermitian_random_walk_laplacian
+    adj_matrix, _, _ = _load_adjacency(args.adjacency_dir)
+    results = compute_hermitian_random_walk_laplacian(
+        adj_matrix, args.q, verbose=True, k=args.k, which=args.which, sigma=args.sigma,
+        dtype=np.dtype(args.dtype), output_dir=args.output_dir,
+        memory_budget=None if args.memory_budget is None else int(args.memory_budget * 2**20)
+    )
+    eigenvalues = results['eigenvalues']
+    logger.info(f"{len(eigenvalues)} eigenvalues in [{eigenvalues.min():.6g}, {eigenvalues.max():.6g}] "
+                f"saved to {args.output_dir}")
+
+
+def _plot(args):
+    from .build_pygsp_graph import build_pygsp_graph
+    from .visualize_pygsp_graph import visualize_pygsp_graph, OUTPUT_FILE
+    adj_matrix, cities, node_coordinates = _load_adjacency(args.adjacency_dir)
+    coordinates = {city: tuple(latlon) for city, latlon in zip(cities, node_coordinates)}
+    # Only the graph is needed for the plot, not its SVD basis
+    G = build_pygsp_graph(adj_matrix, cities, coordinates, svd_method=None)
+    if G is None:
+        return 1
+    visualize_pygsp_graph(G, cities, output_file=args.output_file or OUTPUT_FILE, mode=args.mode,
+                          preview=args.preview, max_edges=args.max_edges)
+
+
+def _run(args):
+    from .main import main
+    graph, _ = main(profile_stage=args.profile_stage, trace_memory=not args.no_trace_memory,
+                    headless=args.headless)
+    return 0 if graph is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+def align_wind_to_cities(df, cities):
+    """
+    Wind speed and direction as arrays aligned to a city order
+    The first row of a district is used when it appears more than once
+    Parameters:
+        df: DataFrame with 'District', 'Speed (in m/s)' and 'Direction (in ° angle)'
+        cities: list of city names, position i is city index i
+    Returns:
+        speeds, directions: float arrays of length len(cities) (NaN without data)
+        has_wind: boolean array, True where the city has a row in df
+    """
+    districts = df['District'].astype(str).str.strip()
+    first_rows = ~districts.duplicated().to_numpy()
+    row_of_district = pd.Series(np.flatnonzero(first_rows), index=districts[first_rows].to_numpy())
+    rows = row_of_district.reindex(pd.Index(cities, dtype=object)).to_numpy()
+    has_wind = ~np.isnan(rows)
+    rows = np.where(has_wind, rows, 0).astype(np.int64)
+
+    speeds = df['Speed (in m/s)'].to_numpy(dtype=float)[rows] if len(df) else np.zeros(len(cities))
+    directions = df['Direction (in ° angle)'].to_numpy(dtype=float)[rows] if len(df) else np.zeros(len(cities))
+    speeds[~has_wind] = np.nan
+    directions[~has_wind] = np.nan
+    return speeds, directions, has_wind
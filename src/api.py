@@ -0,0 +1,45 @@
+"""
+Public API of the package, exported lazily: the module defining a function (and
+its heavy dependencies such as pandas, PyGSP or matplotlib) is only imported on
+first access, e.g.
+
+    from src.api import compute_hermitian_random_walk_laplacian
+
+only imports numpy and scipy. The functions live here rather than on the package
+itself because every module is named after its function: src.build_graph stays
+the module, src.api.build_graph is the function
+"""
+import importlib
+
+# Public name -> module defining it
+_EXPORTS = {name: name for name in [
+    'load_wind_data', 'fetch_all_coordinates', 'load_geocoding_cache', 'load_gazetteer',
+    'geocode_with_gazetteer', 'get_city_coordinates', 'build_graph', 'build_wind_adjacency_matrix',
+    'build_wind_adjacency_batch', 'compute_hermitian_random_walk_laplacian', 'sweep_hermitian_q',
+    'check_reduced_precision', 'apply_chebyshev_filter', 'estimate_spectral_bounds',
+    'compute_batched_gft', 'build_pygsp_graph', 'visualize_pygsp_graph', 'save_pygsp_graph',
+    'save_adjacency_matrix', 'save_binary_results', 'save_blocked_matrix', 'load_binary_results',
+    'run_cached_stage', 'instrument_stage', 'write_run_report', 'generate_synthetic_wind_data', 'main',
+]}
+_EXPORTS.update({
+    'compute_stationary_distribution': 'compute_hermitian_random_walk_laplacian',
+    'resolve_city_coordinates': 'get_city_coordinates',
+    'select_source_edges': 'build_graph',
+    'IncrementalWindGraph': 'incremental_wind_graph',
+    'instrumented': 'instrument_stage',
+    'describe_result': 'instrument_stage',
+})
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __package__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
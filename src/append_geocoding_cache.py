@@ -0,0 +1,14 @@
+import json
+from .load_geocoding_cache import GEOCODING_CACHE_FILE
+
+def append_geocoding_cache(entries, cache_file=GEOCODING_CACHE_FILE):
+    """
+    Append resolved coordinates to the geocoding cache without rewriting it
+    Parameters:
+        entries: iterable of (district, state, (lat, lon))
+        cache_file: json-lines cache file
+    """
+    with open(cache_file, 'a') as f:
+        for district, state, (lat, lon) in entries:
+            f.write(json.dumps({'district': district, 'state': state, 'lat': lat, 'lon': lon}) + "\n")
+        f.flush()
@@ -0,0 +1,67 @@
+import numpy as np
+from .estimate_spectral_bounds import estimate_spectral_bounds
+
+def apply_chebyshev_filter(L, signal, kernel='low_pass', order=30, bounds=None, **kernel_params):
+    """
+    Filter signal(s) with a spectral kernel h(L), approximated by a Chebyshev polynomial in L
+    Only (sparse) matrix-vector products with L are needed, no eigendecomposition,
+    so the cost is O(order * edges) per signal
+    Parameters:
+        L: Hermitian (N x N) Laplacian, sparse or dense (e.g. L_hrw), or a PyGSP
+           graph whose combinatorial Laplacian G.L is used
+        signal: (N,) signal or (N x T) matrix of signals (e.g. wind speeds)
+        kernel: 'low_pass', 'heat', 'band_pass' or a callable h(eigenvalues)
+            low_pass:  h = 1 / (1 + (lambda / cutoff)^4)       (cutoff)
+            heat:      h = exp(-tau * lambda)                  (tau)
+            band_pass: h = exp(-((lambda - center) / width)^2) (center, width)
+        order: degree of the Chebyshev expansion
+        bounds: (lambda_min, lambda_max) containing the spectrum, estimated with
+                estimate_spectral_bounds when None
+        kernel_params: kernel parameters, defaults are relative to the spectrum bounds
+    Returns:
+        filtered signal, same shape as signal
+    """
+    L = getattr(L, 'L', L)
+    lambda_min, lambda_max = estimate_spectral_bounds(L) if bounds is None else bounds
+    h = _make_kernel(kernel, lambda_min, lambda_max, kernel_params)
+
+    # Chebyshev coefficients of h on [lambda_min, lambda_max] (Chebyshev-Gauss nodes)
+    n_nodes = order + 1
+    theta = np.pi * (np.arange(n_nodes) + 0.5) / n_nodes
+    half_width = (lambda_max - lambda_min) / 2
+    center = (lambda_max + lambda_min) / 2
+    samples = h(half_width * np.cos(theta) + center)
+    coefficients = 2 / n_nodes * np.cos(np.outer(np.arange(n_nodes), theta)) @ samples
+
+    # Three-term recurrence on the shifted operator (L - center) / half_width
+    def shifted(x):
+        return (L @ x - center * x) / half_width
+
+    x = np.asarray(signal)
+    T_previous = x
+    T_current = shifted(x)
+    filtered = 0.5 * coefficients[0] * T_previous + coefficients[1] * T_current
+    for k in range(2, n_nodes):
+        T_previous, T_current = T_current, 2 * shifted(T_current) - T_previous
+        filtered = filtered + coefficients[k] * T_current
+    return filtered
+
+
+def _make_kernel(kernel, lambda_min, lambda_max, kernel_params):
+    """
+    Spectral kernel h(lambda) from its name and parameters
+    """
+    if callable(kernel):
+        return kernel
+    span = lambda_max - lambda_min
+    if kernel == 'low_pass':
+        cutoff = kernel_params.get('cutoff', max(lambda_min, 0) + 0.25 * span)
+        return lambda lam: 1 / (1 + (np.maximum(lam, 0) / cutoff) ** 4)
+    if kernel == 'heat':
+        tau = kernel_params.get('tau', 10 / lambda_max if lambda_max > 0 else 1)
+        return lambda lam: np.exp(-tau * lam)
+    if kernel == 'band_pass':
+        center = kernel_params.get('center', lambda_min + 0.5 * span)
+        width = kernel_params.get('width', 0.1 * span)
+        return lambda lam: np.exp(-((lam - center) / width) ** 2)
+    raise ValueError(f"Unknown spectral kernel: {kernel}")
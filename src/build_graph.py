@@ -1,53 +1,113 @@
+import logging
 from collections import defaultdict
-from get_angle_segment import get_angle_segment
-from calculate_bearing import calculate_bearing
-from haversine_distance import haversine_distance
+import numpy as np
+from .compute_pairwise_geometry import compute_pairwise_geometry
+from .select_segment_neighbours import select_segment_neighbours
+from .build_spatial_index import build_spatial_index, query_spatial_index
+from .select_source_edges_parallel import select_source_edges_parallel
+logger = logging.getLogger(__name__)
 
-def build_graph(df, coordinates, radius_km=200, angle_segment_size=5):
+def build_graph(df, coordinates, radius_km=200, angle_segment_size=5, chunk_size=256,
+                max_radius_km=400, use_spatial_index=True, n_jobs=1):
     """
     Build a graph where:
     - Nodes are cities
-    - Edges connect cities within the range between radius_km and 400 km
+    - Edges connect cities within the range between radius_km and max_radius_km
     - At most one city per angle_segment_size degree segment
     Parameters:
         df: DataFrame with city data
         coordinates: dict of {city: (lat, lon)}
         radius_km: minimum distance for edges
         angle_segment_size: size of angle segments in degrees
+        chunk_size: number of source cities processed per vectorized block,
+                    bounds memory to chunk_size x N distance/bearing arrays
+        max_radius_km: maximum distance for edges
+        use_spatial_index: query a KD-tree for candidates within max_radius_km
+                           instead of comparing every pair of cities
+        n_jobs: number of worker processes the chunks are sharded across
+                (None uses every CPU, 1 runs in this process)
     Returns:
         graph: dict of {city: [list of edge dicts]}
     """
 
     graph = defaultdict(list)
     cities = [city for city in df['District'].unique() if city in coordinates]
-    print("Building Graph: \n")
-    for idx, city1 in enumerate(cities, 1):
-        lat1, lon1 = coordinates[city1]
-        # Store candidates for each angle segment
-        angle_segments = defaultdict(list)
-        for city2 in cities:
-            if city1 == city2:
-                continue
-            lat2, lon2 = coordinates[city2]
-            distance = haversine_distance(lat1, lon1, lat2, lon2)
-            if (distance > radius_km) and (distance <= 400):
-                # Calculate bearing/angle
-                bearing = calculate_bearing(lat1, lon1, lat2, lon2)
-                segment = get_angle_segment(bearing, angle_segment_size)
-                angle_segments[segment].append((city2, distance, bearing))
-        
-        # Select closest city from each angle segment
-        for segment, candidates in angle_segments.items():
-            # Sort by distance and take the closest
-            candidates.sort(key=lambda x: x[1])
-            closest_city, distance, bearing = candidates[0]
-            graph[city1].append({
-                'city': closest_city,
-                'distance': distance,
-                'bearing': bearing,
-                'segment': segment
+    logger.info("Building Graph:")
+    n = len(cities)
+    lats = np.array([coordinates[city][0] for city in cities], dtype=float)
+    lons = np.array([coordinates[city][1] for city in cities], dtype=float)
+
+    if n_jobs == 1:
+        tree = build_spatial_index(lats, lons) if use_spatial_index and n > 0 else None
+        blocks = []
+        for start in range(0, n, chunk_size):
+            sources = np.arange(start, min(start + chunk_size, n))
+            blocks.append((sources, select_source_edges(
+                sources, lats, lons, radius_km, angle_segment_size, max_radius_km, tree
+            )))
+    else:
+        blocks = select_source_edges_parallel(
+            lats, lons, radius_km, angle_segment_size, max_radius_km,
+            use_spatial_index=use_spatial_index, chunk_size=chunk_size, n_jobs=n_jobs
+        )
+
+    for sources, (rows, cols, distances, bearings, segments) in blocks:
+        for row, col, distance, bearing, segment in zip(rows, cols, distances, bearings, segments):
+            graph[cities[sources[row]]].append({
+                'city': cities[col],
+                'distance': float(distance),
+                'bearing': float(bearing),
+                'segment': int(segment)
             })
-    print("Graph generated successfully\n")
+    logger.info("Graph generated successfully")
     return graph
 
 
+def select_source_edges(sources, lats, lons, radius_km, angle_segment_size, max_radius_km=400, tree=None):
+    """
+    Edges of a block of source cities: the closest city of every angle segment among
+    the cities in the (radius_km, max_radius_km] band
+    Parameters:
+        sources: indices of the source cities
+        lats, lons: coordinates of all cities
+        radius_km, max_radius_km: distance band of the edges
+        angle_segment_size: size of angle segments in degrees
+        tree: KD-tree from build_spatial_index, None compares against every city
+    Returns:
+        rows, cols, distances, bearings, segments: one entry per edge, rows are
+        positions in sources and cols city indices, ordered like the scalar loop
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    # Bearings lie in [0, 360], so this covers every get_angle_segment bucket
+    n_segments = int(360 // angle_segment_size) + 1
+    if tree is not None:
+        # Only candidates inside the max_radius_km ball of each source
+        rows, cols = query_spatial_index(tree, sources, max_radius_km)
+        distances, bearings = compute_pairwise_geometry(
+            lats[sources[rows]], lons[sources[rows]], lats[cols], lons[cols]
+        )
+        in_range = (distances > radius_km) & (distances <= max_radius_km) & (cols != sources[rows])
+        rows, cols = rows[in_range], cols[in_range]
+        candidate_distances = distances[in_range]
+        candidate_bearings = bearings[in_range]
+    else:
+        distances, bearings = compute_pairwise_geometry(
+            lats[sources, np.newaxis], lons[sources, np.newaxis],
+            lats[np.newaxis, :], lons[np.newaxis, :]
+        )
+        in_range = (distances > radius_km) & (distances <= max_radius_km)
+        # A city is never its own neighbour
+        in_range[np.arange(len(sources)), sources] = False
+
+        rows, cols = np.nonzero(in_range)
+        candidate_distances = distances[rows, cols]
+        candidate_bearings = bearings[rows, cols]
+
+    segments = (candidate_bearings // angle_segment_size).astype(np.int64)
+
+    # Select closest city from each angle segment
+    selected = select_segment_neighbours(
+        rows, cols, candidate_distances, segments, len(sources), n_segments
+    )
+    return (rows[selected], cols[selected], candidate_distances[selected],
+            candidate_bearings[selected], segments[selected])
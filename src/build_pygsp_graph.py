@@ -1,14 +1,30 @@
+import logging
 import numpy as np
+logger = logging.getLogger(__name__)
 
-def build_pygsp_graph(adj_matrix, cities, coordinates):
+def build_pygsp_graph(adj_matrix, cities, coordinates, svd_method='full', svd_rank=None,
+                      svd_which='LM', svd=None, verbose=False):
     """
     Build a PyGSP graph from the wind-weighted adjacency matrix
     Parameters:
-        adj_matrix: NxN numpy array with wind speeds as edge weights
+        adj_matrix: NxN numpy array or scipy sparse matrix with wind speeds as edge weights
         cities: list of city names
         coordinates: dict of {city: (lat, lon)}
+        svd_method: how the SVD of the Laplacian is computed
+            'full'       : dense np.linalg.svd (all N singular triplets)
+            'sparse'     : scipy.sparse.linalg.svds on the sparse Laplacian
+            'randomized' : randomized range finder on the sparse Laplacian (leading triplets)
+            None         : no SVD, only the graph and its Laplacian (e.g. for plotting)
+        svd_rank: number of singular triplets r to keep (None keeps all, 'full' only)
+        svd_which: 'LM' for the leading (largest) or 'SM' for the trailing (smallest)
+                   singular values, used by 'full' truncation and 'sparse' ('randomized'
+                   only supports 'LM' and raises ValueError otherwise)
+        svd: previously computed G.svd (e.g. from the stage cache), reused instead of
+             recomputing the SVD
+        verbose: log the adjacency matrix (INFO level)
     Returns:
-        G: PyGSP Graph object
+        G: PyGSP Graph object, with the SVD basis and GFT of the signal in G.svd
+           (G.svd is None when svd_method is None and no svd is given)
     """
     try:
         from pygsp import graphs
@@ -24,40 +40,40 @@ def build_pygsp_graph(adj_matrix, cities, coordinates):
         G = graphs.Graph(W, coords=coords_array)
         G.city_names = cities
     
-        print(f"Number of nodes: {G.N}")
-        print(f"Number of edges: {G.Ne}")
-        print(f"Is directed: {G.is_directed()}")
+        logger.info(f"Number of nodes: {G.N}")
+        logger.info(f"Number of edges: {G.Ne}")
+        logger.info(f"Is directed: {G.is_directed()}")
 
         # Compute graph Laplacian
         G.compute_laplacian(lap_type='combinatorial')
-        print(f"Laplacian computed (type: combinatorial)")
-        print("adj matrix:\n", adj_matrix,"\n")
+        logger.debug(f"Laplacian computed (type: combinatorial)")
+        if verbose:
+            logger.info("adj matrix:\n%s", adj_matrix)
+        if svd is None and svd_method is None:
+            G.svd = None
+            return G
         signal = np.array(adj_matrix.sum(axis=1)).flatten()
 
-        # Perform SVD on the Laplacian matrix
-        # Get the Laplacian matrix
-        L = G.L.toarray() if hasattr(G.L, 'toarray') else G.L
+        # Perform SVD on the Laplacian matrix: L = UΣV^T
+        if svd is None:
+            U_svd, sigma, V = _compute_laplacian_svd(G.L, svd_method, svd_rank, svd_which)
+        else:
+            U_svd, sigma, V = svd['U'], svd['sigma'], svd['V']
 
-        # Compute SVD: L = UΣV^T
-        U_svd, sigma, Vt = np.linalg.svd(L, full_matrices=True)
-
-        print(f"  U shape (left singular vectors): {U_svd.shape}")
-        print(f"  Σ shape (singular values): {sigma.shape}")
-        print(f"  V^T shape (right singular vectors): {Vt.shape}")
-
-        V = Vt.T  # Transpose to get V from V^T
-        Sigma_matrix = np.diag(sigma)  # Convert to diagonal matrix
-
-        signal_reshaped = signal.reshape(-1, 1)
-        print("signal shape: ", signal.shape)
+        logger.debug(f"  U shape (left singular vectors): {U_svd.shape}")
+        logger.debug(f"  Σ shape (singular values): {sigma.shape}")
+        logger.debug(f"  V shape (right singular vectors): {V.shape}")
+        logger.debug(f"signal shape: {signal.shape}")
         
         # z1 = (U^T + V^T)x/2
         # z2 = (U^T - V^T)x/2
-
-        z1 = ((U_svd.T + V.T) @ signal_reshaped) / 2
-        z2 = ((U_svd.T - V.T) @ signal_reshaped) / 2
+        # computed as U^T x and V^T x, without forming U^T ± V^T
+        Ut_signal = U_svd.T @ signal
+        Vt_signal = V.T @ signal
+        z1 = ((Ut_signal + Vt_signal) / 2).reshape(-1, 1)
+        z2 = ((Ut_signal - Vt_signal) / 2).reshape(-1, 1)
         # Combine z1 and z2
-        gft_signal = np.vstack([z1, z2])  # Shape: (2N, 1)
+        gft_signal = np.vstack([z1, z2])  # Shape: (2r, 1)
 
         # This is the inverse transformation
         def igft_svd(z1, z2, U_svd, V):
@@ -68,10 +84,70 @@ def build_pygsp_graph(adj_matrix, cities, coordinates):
             result = 0.5 * (U_svd @ (z1 + z2) + V @ (z1 - z2))
             return result
         
-        # Reconstruct signal using IGFT
+        # Reconstruct signal using IGFT (a projection when the basis is truncated)
+        signal_reshaped = signal.reshape(-1, 1)
         reconstructed_signal_svd = igft_svd(z1, z2, U_svd, V)
-        print(f"Reconstruction error: {np.linalg.norm(signal_reshaped - reconstructed_signal_svd)}")
+        reconstruction_error = np.linalg.norm(signal_reshaped - reconstructed_signal_svd)
+        logger.info(f"Reconstruction error: {reconstruction_error}")
+        signal_norm = np.linalg.norm(signal)
+        if sigma.shape[0] < G.N and signal_norm > 0:
+            logger.debug(f"Relative reconstruction error (rank {sigma.shape[0]}): {reconstruction_error / signal_norm}")
+        G.svd = {
+            'U': U_svd,
+            'sigma': sigma,
+            'V': V,
+            'gft': gft_signal,
+            'reconstruction_error': reconstruction_error
+        }
         return G        
     except ImportError:
-        print("\nERROR: PyGSP not installed!")
+        logger.error("PyGSP not installed!")
         return None
+
+
+def _compute_laplacian_svd(L, svd_method, svd_rank, svd_which):
+    """
+    Singular triplets (U, sigma, V) of the Laplacian, sorted by decreasing singular value
+    """
+    import scipy.sparse as sp
+    from scipy.sparse.linalg import svds
+
+    N = L.shape[0]
+    if svd_method == 'full':
+        L_dense = L.toarray() if hasattr(L, 'toarray') else L
+        U_svd, sigma, Vt = np.linalg.svd(L_dense, full_matrices=True)
+        if svd_rank is not None:
+            keep = slice(0, svd_rank) if svd_which == 'LM' else slice(N - svd_rank, N)
+            U_svd, sigma, Vt = U_svd[:, keep], sigma[keep], Vt[keep]
+        return U_svd, sigma, Vt.T
+
+    if svd_rank is None:
+        raise ValueError(f"svd_method='{svd_method}' needs svd_rank")
+    L = sp.csr_matrix(L, dtype=float)
+    if svd_method == 'sparse':
+        U_svd, sigma, Vt = svds(L, k=svd_rank, which=svd_which)
+    elif svd_method == 'randomized':
+        if svd_which != 'LM':
+            raise ValueError(f"svd_method='randomized' only computes the leading singular values, "
+                             f"not svd_which='{svd_which}'")
+        U_svd, sigma, Vt = _randomized_svd(L, svd_rank)
+    else:
+        raise ValueError(f"Unknown SVD method: {svd_method}")
+    order = np.argsort(sigma)[::-1]
+    return U_svd[:, order], sigma[order], Vt[order].T
+
+
+def _randomized_svd(L, rank, n_oversamples=10, n_power_iterations=4, seed=0):
+    """
+    Leading singular triplets of a sparse matrix with a randomized range finder (Halko et al.)
+    """
+    rng = np.random.default_rng(seed)
+    n_samples = min(rank + n_oversamples, L.shape[1])
+    Q, _ = np.linalg.qr(L @ rng.standard_normal((L.shape[1], n_samples)))
+    # Power iterations sharpen the decay of the spectrum
+    for _ in range(n_power_iterations):
+        Q, _ = np.linalg.qr(L.T @ Q)
+        Q, _ = np.linalg.qr(L @ Q)
+    B = (L.T @ Q).T
+    U_small, sigma, Vt = np.linalg.svd(B, full_matrices=False)
+    return (Q @ U_small)[:, :rank], sigma[:rank], Vt[:rank]
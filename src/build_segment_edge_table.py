@@ -0,0 +1,31 @@
+import numpy as np
+
+def build_segment_edge_table(graph, city_index):
+    """
+    Precompute, for every source city of the graph, its candidate targets per angle segment
+    Parameters:
+        graph: dict of {city: [list of edge dicts]} from build_graph
+        city_index: dict of {city: index}
+    Returns:
+        sources: (S,) city index of each source, in graph order
+        table: (S x n_segments x K) target indices per source and edge segment, sorted
+               by distance (ties keep the edge order) and padded with -1
+    """
+    sources = np.array([city_index[city] for city in graph], dtype=np.int64)
+    n_segments = 1 + max((edge['segment'] for edges in graph.values() for edge in edges), default=0)
+    buckets = []
+    max_candidates = 1
+    for edges in graph.values():
+        by_segment = {}
+        for edge in edges:
+            by_segment.setdefault(edge['segment'], []).append(edge)
+        for segment, segment_edges in by_segment.items():
+            segment_edges.sort(key=lambda edge: edge['distance'])
+            max_candidates = max(max_candidates, len(segment_edges))
+        buckets.append(by_segment)
+
+    table = np.full((len(sources), n_segments, max_candidates), -1, dtype=np.int64)
+    for s, by_segment in enumerate(buckets):
+        for segment, segment_edges in by_segment.items():
+            table[s, segment, :len(segment_edges)] = [city_index[edge['city']] for edge in segment_edges]
+    return sources, table
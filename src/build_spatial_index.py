@@ -0,0 +1,42 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371
+
+def build_spatial_index(lats, lons):
+    """
+    Build a KD-tree over cities as 3D points on the unit sphere
+    Parameters:
+        lats, lons: arrays of coordinates in decimal degrees
+    Returns:
+        tree: scipy cKDTree, point i is city i
+    """
+    lat, lon = np.radians(lats), np.radians(lons)
+    xyz = np.column_stack([
+        np.cos(lat) * np.cos(lon),
+        np.cos(lat) * np.sin(lon),
+        np.sin(lat)
+    ])
+    return cKDTree(xyz)
+
+
+def query_spatial_index(tree, indices, max_distance_km):
+    """
+    Find all indexed cities within max_distance_km (great circle) of the given cities
+    Parameters:
+        tree: KD-tree returned by build_spatial_index
+        indices: indices of the source cities in the tree
+        max_distance_km: great circle search radius
+    Returns:
+        rows: position of the source in indices for each candidate
+        cols: index of the candidate city, ascending for each source
+    """
+    # Great circle distance -> chord length on the unit sphere, padded so that
+    # rounding never drops a city lying exactly on the boundary
+    angle = min(max_distance_km / EARTH_RADIUS_KM, np.pi)
+    chord = 2 * np.sin(angle / 2) * (1 + 1e-9) + 1e-12
+    neighbours = tree.query_ball_point(tree.data[indices], r=chord, return_sorted=True)
+    lengths = np.array([len(found) for found in neighbours], dtype=np.int64)
+    rows = np.repeat(np.arange(len(indices)), lengths)
+    cols = np.concatenate(neighbours).astype(np.int64) if lengths.sum() else np.zeros(0, dtype=np.int64)
+    return rows, cols
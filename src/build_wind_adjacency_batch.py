@@ -0,0 +1,64 @@
+import logging
+import numpy as np
+import scipy.sparse as sp
+from .build_segment_edge_table import build_segment_edge_table
+logger = logging.getLogger(__name__)
+
+def build_wind_adjacency_batch(graph, cities, speeds, directions, angle_segment_size=20):
+    """
+    Build the wind adjacency matrices of T wind snapshots over the same geometric graph
+    Same rule as build_wind_adjacency_matrix, applied to all snapshots at once: every
+    source (in graph order) assigns its wind speed to the closest city in its wind
+    segment that has no outgoing edge yet in that snapshot
+    Parameters:
+        graph: dict of {city: [list of edge dicts]} from build_graph
+        cities: list of city names (matrix order, as returned by build_wind_adjacency_matrix)
+        speeds: (T x N) wind speeds aligned to cities (see align_wind_to_cities)
+        directions: (T x N) wind directions in degrees, NaN where a city has no reading
+        angle_segment_size: size of the wind direction segments in degrees
+    Returns:
+        adj_batch: (T*N x N) CSR matrix, rows t*N to (t+1)*N - 1 hold snapshot t
+        cities: list of city names
+    """
+    speeds = np.atleast_2d(np.asarray(speeds, dtype=float))
+    directions = np.atleast_2d(np.asarray(directions, dtype=float))
+    T, n = speeds.shape
+    city_index = {city: i for i, city in enumerate(cities)}
+
+    # Edge-per-segment table computed once for all snapshots
+    sources, table = build_segment_edge_table(graph, city_index)
+    n_segments = table.shape[1]
+    snapshots = np.arange(T)
+    has_outgoing = np.zeros((T, n), dtype=bool)
+    rows, cols, weights = [], [], []
+
+    for s, source_idx in enumerate(sources):
+        source_directions = directions[:, source_idx]
+        has_reading = ~np.isnan(source_directions)
+        wind_segment = np.zeros(T, dtype=np.int64)
+        wind_segment[has_reading] = source_directions[has_reading] // angle_segment_size
+        has_reading &= (wind_segment >= 0) & (wind_segment < n_segments)
+
+        # Candidates of every snapshot's wind segment, closest first
+        candidates = table[s][np.where(has_reading, wind_segment, 0)]
+        available = (candidates >= 0) & has_reading[:, np.newaxis]
+        available &= ~has_outgoing[snapshots[:, np.newaxis], np.maximum(candidates, 0)]
+        assigned = available.any(axis=1)
+        if not assigned.any():
+            continue
+        t = snapshots[assigned]
+        targets = candidates[t, available[assigned].argmax(axis=1)]
+        source_speeds = speeds[t, source_idx]
+
+        #because in wind data, the direction is about wind coming into the source not going outward from the source
+        rows.append(t * n + targets)
+        cols.append(np.full(len(t), source_idx))
+        weights.append(source_speeds)
+        has_outgoing[t[source_speeds > 0], targets[source_speeds > 0]] = True
+
+    if rows:
+        rows, cols, weights = np.concatenate(rows), np.concatenate(cols), np.concatenate(weights)
+    adj_batch = sp.csr_matrix((weights, (rows, cols)), shape=(T * n, n))
+    adj_batch.eliminate_zeros()
+    logger.info(f"Built {T} adjacency matrices over {n} nodes ({adj_batch.nnz} edges in total)")
+    return adj_batch, cities
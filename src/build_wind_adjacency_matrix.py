@@ -1,35 +1,40 @@
+import logging
 import numpy as np
+import scipy.sparse as sp
+from .align_wind_to_cities import align_wind_to_cities
+logger = logging.getLogger(__name__)
 
-def build_wind_adjacency_matrix(df, graph, coordinates, angle_segment_size=20):
+def build_wind_adjacency_matrix(df, graph, coordinates, angle_segment_size=20, sparse=False, dtype=np.float64):
     """
     Build NxN adjacency matrix using wind speed as edge weight with consideration of wind direction
     For each source city:
     - Find all cities in the wind direction segment
     - Assign wind speed ONLY to the closest city in that segment
     - All other cities in that segment get 0
+    With sparse=True the matrix is assembled as a scipy CSR matrix, so memory
+    scales with the number of edges instead of N^2
+    dtype sets the precision of the weights (np.float32 halves the memory, the
+    wind speeds only carry a couple of significant digits)
     """
 
     cities = list(coordinates.keys())
     city_index = {city: i for i, city in enumerate(cities)}
     n = len(cities)
 
-    adj_matrix = np.zeros((n, n))
-    df['District'] = df['District'].astype(str).str.strip()
-    wind_lookup = df.set_index('District')[[
-        'Speed (in m/s)', 
-        'Direction (in ° angle)'
-    ]]
+    # Assigned edges as (row, col, weight) triplets
+    rows, cols, weights = [], [], []
+    # has_outgoing[i] is True once row i holds a positive weight
+    has_outgoing = np.zeros(n, dtype=bool)
+    # Wind readings aligned to the city index (first row of duplicated districts)
+    speeds, directions, has_wind = align_wind_to_cities(df, cities)
 
     for source_city, edges in graph.items():
-        if source_city not in wind_lookup.index:
-            continue
-
-        wind_speed = wind_lookup.loc[source_city, 'Speed (in m/s)']
-        wind_dir = wind_lookup.loc[source_city, 'Direction (in ° angle)']
         source_idx = city_index[source_city]
+        if not has_wind[source_idx]:
+            continue
 
         # Convert wind direction into angle segment
-        wind_segment = int(wind_dir.iloc[0] // angle_segment_size) if hasattr(wind_dir, 'iloc') else int(wind_dir // angle_segment_size)
+        wind_segment = int(directions[source_idx] // angle_segment_size)
         # Find all cities in the wind direction segment
         cities_in_wind_segment = []
         
@@ -40,8 +45,7 @@ def build_wind_adjacency_matrix(df, graph, coordinates, angle_segment_size=20):
             if edge_segment == wind_segment:
                 target_city = edge['city']
                 target_idx = city_index[target_city]
-                has_outgoing = np.any(adj_matrix[target_idx, :] > 0)
-                if not has_outgoing:
+                if not has_outgoing[target_idx]:
                     cities_in_wind_segment.append({
                         'city': edge['city'],
                         'distance': edge['distance']
@@ -57,14 +61,25 @@ def build_wind_adjacency_matrix(df, graph, coordinates, angle_segment_size=20):
             closest_idx = city_index[closest_city]
             
             # Assign wind speed to the closest city only
-            wind_speed_value = wind_speed.iloc[0] if hasattr(wind_speed, 'iloc') else wind_speed
+            wind_speed_value = speeds[source_idx]
 
             #because in wind data, the direction is about wind coming into the source not going outward from the source
-            adj_matrix[closest_idx,source_idx] = wind_speed_value
-            
-    row_sums = np.count_nonzero(adj_matrix, axis=1)
+            rows.append(closest_idx)
+            cols.append(source_idx)
+            weights.append(wind_speed_value)
+            if wind_speed_value > 0:
+                has_outgoing[closest_idx] = True
+
+    if sparse:
+        adj_matrix = sp.csr_matrix((np.array(weights, dtype=dtype), (rows, cols)), shape=(n, n))
+        adj_matrix.eliminate_zeros()
+        row_sums = adj_matrix.getnnz(axis=1)
+    else:
+        adj_matrix = np.zeros((n, n), dtype=dtype)
+        adj_matrix[rows, cols] = weights
+        row_sums = np.count_nonzero(adj_matrix, axis=1)
     
-    print(f"Total nodes: {n}")
-    print(f"Rows with exactly 1 connection: {np.sum(row_sums == 1)}")
-    print(f"Rows with 0 connections: {np.sum(row_sums == 0)}")
+    logger.info(f"Total nodes: {n}")
+    logger.info(f"Rows with exactly 1 connection: {np.sum(row_sums == 1)}")
+    logger.info(f"Rows with 0 connections: {np.sum(row_sums == 0)}")
     return adj_matrix, cities
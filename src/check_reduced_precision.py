@@ -0,0 +1,113 @@
+from collections import deque
+import numpy as np
+import scipy.sparse as sp
+from .compute_hermitian_random_walk_laplacian import compute_hermitian_random_walk_laplacian
+from .compute_batched_gft import compute_batched_gft
+
+def check_reduced_precision(W, q=0.01, dtype=np.float32, sample_size=500, n_signals=16, seed=0,
+                            tolerance=1e-3, min_edges=None, **options):
+    """
+    Accuracy of the reduced precision mode of compute_hermitian_random_walk_laplacian
+    against a float64 reference, to decide whether dtype is safe for a graph
+    Both full spectra are computed on the subgraph induced by sample_size nodes
+    (the whole graph when it is smaller), grown as breadth-first balls around random
+    seeds so that the sample keeps the edges of its neighbourhoods; a uniform node
+    sample of a graph with about one out-edge per node would be nearly edgeless
+    Parameters:
+        W: adjacency matrix (numpy array or scipy sparse)
+        q: phase parameter
+        dtype: reduced real precision to check, e.g. np.float32
+        sample_size: number of sampled nodes
+        n_signals: number of random signals pushed through GFT/IGFT
+        seed: seed of the node sample and of the signals
+        tolerance: largest acceptable relative error
+        min_edges: fewest edges a sample may have (default sample_size // 2), a sparser
+                   sample raises ValueError as the check would pass trivially
+        options: other compute_hermitian_random_walk_laplacian options (stationary_method, teleport,
+                 redistribute_dangling)
+    Returns:
+        dict with
+            - nodes: number of sampled nodes
+            - edges: number of edges between them
+            - eigenvalue_drift: max |λ_reduced - λ_float64| (eigenvalues sorted ascending)
+            - relative_eigenvalue_drift: eigenvalue_drift / max |λ_float64|
+            - reconstruction_error: max relative error of IGFT(GFT(x)) in reduced precision
+            - reference_reconstruction_error: the same in float64
+            - igft_error: relative difference of the IGFT of the out-degree signal
+            - safe: every relative error is below tolerance
+    """
+    rng = np.random.default_rng(seed)
+    N = W.shape[0]
+    if N > sample_size:
+        nodes = _sample_neighbourhoods(W, sample_size, rng)
+        W = W[nodes][:, nodes] if sp.issparse(W) else W[np.ix_(nodes, nodes)]
+        min_edges = sample_size // 2 if min_edges is None else min_edges
+        if _count_edges(W) < min_edges:
+            raise ValueError(f"sampled subgraph has {_count_edges(W)} edges (< {min_edges}), "
+                             f"the precision check would be trivial")
+    options = {**options, 'verbose': False, 'output_dir': None, 'k': None}
+    reference = compute_hermitian_random_walk_laplacian(W, q, dtype=np.float64, **options)
+    reduced = compute_hermitian_random_walk_laplacian(W, q, dtype=dtype, **options)
+
+    eigenvalue_drift = float(np.abs(reduced['eigenvalues'].astype(np.float64) - reference['eigenvalues']).max())
+    scale = max(float(np.abs(reference['eigenvalues']).max()), np.finfo(np.float64).tiny)
+
+    signals = rng.standard_normal((W.shape[0], n_signals))
+    signal_norms = np.linalg.norm(signals, axis=0)
+
+    def reconstruction_error(U, signal_dtype):
+        igft = compute_batched_gft(U, signals, dtype=signal_dtype)['IGFT']
+        return float((np.linalg.norm(igft - signals, axis=0) / signal_norms).max())
+
+    reference_igft_norm = max(float(np.linalg.norm(reference['IGFT'])), np.finfo(np.float64).tiny)
+    report = {
+        'nodes': int(W.shape[0]),
+        'edges': _count_edges(W),
+        'dtype': np.dtype(dtype).name,
+        'eigenvalue_drift': eigenvalue_drift,
+        'relative_eigenvalue_drift': eigenvalue_drift / scale,
+        'reconstruction_error': reconstruction_error(reduced['eigenvectors'], dtype),
+        'reference_reconstruction_error': reconstruction_error(reference['eigenvectors'], np.float64),
+        'igft_error': float(np.linalg.norm(reduced['IGFT'] - reference['IGFT']) / reference_igft_norm),
+    }
+    report['safe'] = bool(max(report['relative_eigenvalue_drift'], report['reconstruction_error'],
+                              report['igft_error']) < tolerance)
+    return report
+
+
+def _sample_neighbourhoods(W, sample_size, rng):
+    """
+    sample_size nodes taken as breadth-first balls (edges in either direction) around
+    random seeds, nodes with edges are used as seeds first
+    """
+    undirected = sp.csr_matrix(W, dtype=bool)
+    undirected = (undirected + undirected.T).tocsr()
+    degree = np.diff(undirected.indptr)
+    seeds = rng.permutation(W.shape[0])
+    seeds = seeds[np.argsort(degree[seeds] == 0, kind='stable')]
+    visited = np.zeros(W.shape[0], dtype=bool)
+    nodes = []
+    for seed in seeds:
+        if visited[seed]:
+            continue
+        visited[seed] = True
+        queue = deque([seed])
+        while queue and len(nodes) < sample_size:
+            node = queue.popleft()
+            nodes.append(node)
+            for neighbour in undirected.indices[undirected.indptr[node]:undirected.indptr[node + 1]]:
+                if not visited[neighbour]:
+                    visited[neighbour] = True
+                    queue.append(neighbour)
+        if len(nodes) >= sample_size:
+            break
+    return np.sort(nodes)
+
+
+def _count_edges(W):
+    """
+    Number of nonzero off-diagonal weights
+    """
+    if sp.issparse(W):
+        return int(W.nnz - np.count_nonzero(W.diagonal()))
+    return int(np.count_nonzero(W) - np.count_nonzero(np.diag(W)))
@@ -0,0 +1,132 @@
+import os
+from pathlib import Path
+import numpy as np
+from .save_blocked_matrix import vectors_per_block
+
+def compute_batched_gft(U, signals, V=None, chunk_size=1024, inverse=True, output_dir=None, dtype=None,
+                        memory_budget=None):
+    """
+    Forward (and inverse) graph Fourier transform of many signals at once
+    Each chunk of signals costs one matrix-matrix product against the cached basis
+    instead of one matrix-vector product per signal
+    Parameters:
+        U: (N x K) eigenvectors (e.g. results['eigenvectors'] of the Hermitian Laplacian),
+           or left singular vectors when V is given
+        signals: (N x T) array (one column per snapshot), path to a .npy file of that
+                 shape (read memory-mapped), or an iterable of (N x t) chunks
+        V: right singular vectors (N x K) for the SVD based GFT of build_pygsp_graph,
+           the coefficients are then [z1; z2] with z1 = (U^T + V^T)x/2, z2 = (U^T - V^T)x/2
+        chunk_size: number of columns per product when signals is an array or a file
+        inverse: also compute the IGFT (reconstruction) of every chunk
+        output_dir: if given, the coefficients of chunk i are written to
+                    output_dir/gft_{i:05d}.npy (and igft_{i:05d}.npy) as they are
+                    computed instead of being kept in memory
+        dtype: precision the signal chunks are cast to, e.g. np.float32 with a complex64
+               basis so the products run in single precision (None keeps the signals' dtype)
+        memory_budget: bytes of working memory, None holds the whole basis in memory.
+                       Otherwise the basis (e.g. eigenvectors memory-mapped by
+                       load_binary_results) is streamed in column blocks and
+                       chunk_size is lowered so that a basis block, a signal chunk and
+                       its coefficients and reconstruction each take about a quarter
+                       of the budget; combine with output_dir to keep the results on disk
+    Returns:
+        dict containing:
+            - GFT: (K x T) or (2K x T) coefficients, None when written to output_dir
+            - IGFT: (N x T) reconstructed signals, None when not computed or written to output_dir
+            - n_signals: number of transformed signals T
+            - n_chunks: number of chunks
+            - files: list of written files
+    """
+    if memory_budget is None:
+        blocks = [slice(None)]
+        # Conjugate transposes computed once for all chunks
+        U_H = U.conj().T
+        V_H = V.conj().T if V is not None else None
+    else:
+        N, K = U.shape
+        part = memory_budget / 4
+        step = vectors_per_block(N, U.dtype, part)
+        blocks = [slice(start, start + step) for start in range(0, K, step)]
+        chunk_size = min(chunk_size, vectors_per_block(max(N, 2 * K), U.dtype, part))
+        U_H = V_H = None
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    gft_chunks, igft_chunks, files = [], [], []
+    n_signals = 0
+    n_chunks = 0
+    for chunk in _iter_signal_chunks(signals, chunk_size):
+        if dtype is not None:
+            chunk = chunk.astype(dtype, copy=False)
+        if V is None:
+            coefficients = _project(U, U_H, chunk, blocks)
+        else:
+            u_part = _project(U, U_H, chunk, blocks)
+            v_part = _project(V, V_H, chunk, blocks)
+            coefficients = np.vstack([(u_part + v_part) / 2, (u_part - v_part) / 2])
+        reconstructed = None
+        if inverse:
+            if V is None:
+                reconstructed = _expand(U, coefficients, blocks)
+            else:
+                z1, z2 = np.split(coefficients, 2)
+                reconstructed = 0.5 * (_expand(U, z1 + z2, blocks) + _expand(V, z1 - z2, blocks))
+
+        if output_dir is not None:
+            gft_file = Path(output_dir) / f"gft_{n_chunks:05d}.npy"
+            np.save(gft_file, coefficients)
+            files.append(gft_file)
+            if inverse:
+                igft_file = Path(output_dir) / f"igft_{n_chunks:05d}.npy"
+                np.save(igft_file, reconstructed)
+                files.append(igft_file)
+        else:
+            gft_chunks.append(coefficients)
+            if inverse:
+                igft_chunks.append(reconstructed)
+        n_signals += chunk.shape[1]
+        n_chunks += 1
+
+    return {
+        'GFT': np.hstack(gft_chunks) if gft_chunks else None,
+        'IGFT': np.hstack(igft_chunks) if igft_chunks else None,
+        'n_signals': n_signals,
+        'n_chunks': n_chunks,
+        'files': files
+    }
+
+
+def _project(basis, basis_H, chunk, blocks):
+    """
+    basis^H @ chunk, one block of basis columns at a time unless basis_H is given
+    """
+    if basis_H is not None:
+        return basis_H @ chunk
+    return np.vstack([basis[:, block].conj().T @ chunk for block in blocks])
+
+
+def _expand(basis, coefficients, blocks):
+    """
+    basis @ coefficients, accumulated over blocks of basis columns
+    """
+    reconstructed = basis[:, blocks[0]] @ coefficients[blocks[0]]
+    for block in blocks[1:]:
+        reconstructed += basis[:, block] @ coefficients[block]
+    return reconstructed
+
+
+def _iter_signal_chunks(signals, chunk_size):
+    """
+    Yield (N x t) blocks of signals from an array, a .npy file or an iterable of chunks
+    """
+    if isinstance(signals, (str, Path)):
+        signals = np.load(signals, mmap_mode='r')
+    if isinstance(signals, np.ndarray):
+        if signals.ndim == 1:
+            signals = signals.reshape(-1, 1)
+        for start in range(0, signals.shape[1], chunk_size):
+            yield np.asarray(signals[:, start:start + chunk_size])
+    else:
+        for chunk in signals:
+            chunk = np.asarray(chunk)
+            yield chunk.reshape(-1, 1) if chunk.ndim == 1 else chunk
@@ -1,20 +1,81 @@
+import logging
 from pprint import pformat
 import numpy as np
-import json
-from to_json_format import to_jsonable
+from pathlib import Path
 from scipy import linalg
+import scipy.sparse as sp
+from scipy.sparse import linalg as sparse_linalg
+from .save_binary_results import save_binary_results
+from .save_blocked_matrix import save_blocked_matrix
+from .compute_batched_gft import compute_batched_gft
+HERMITIAN_OUTPUT_DIR = Path("output") / "hermitian_rw_results"
+# Largest N for which a partial spectrum ARPACK and LOBPCG could not resolve is computed densely
+DENSE_FALLBACK_MAX_N = 5000
+LOBPCG_TOL = 1e-8
+LOBPCG_MAX_ITER = 500
+logger = logging.getLogger(__name__)
 
-def compute_hermitian_random_walk_laplacian(W, q=0.01, verbose=True):
+def compute_hermitian_random_walk_laplacian(W, q=0.01, verbose=True, k=None, which='SA', sigma=None,
+                                            stationary_method='power', teleport=0.0, pi0=None,
+                                            output_dir=HERMITIAN_OUTPUT_DIR, previous=None,
+                                            warm_tol=1e-8, warm_max_iter=200, dtype=np.float64,
+                                            memory_budget=None, eigsh_tol=0.0, eigsh_ncv=None,
+                                            eigsh_max_iter=None, redistribute_dangling=False, stationary=None):
     """
     Compute the Unnormalized Hermitian Random Walk Laplacian for a directed graph.
     Parameters:
     -----------
-    W : numpy.ndarray
-        Weighted adjacency matrix (N x N) where W[i,j] is the weight from node i to node j
+    W : numpy.ndarray or scipy.sparse matrix
+        Weighted adjacency matrix (N x N) where W[i,j] is the weight from node i to node j.
+        A sparse W is processed on its nonzero pattern only: P, Pi, P_tilde, Gamma_q,
+        P_tilde_hermitian and L_hrw are then returned as sparse matrices. The sparse
+        Gamma_q only stores the phases on the pattern of W + W^T: its implicit zeros
+        elsewhere (including the diagonal) stand for the phase 1 of the dense Gamma_q
+        and are meaningless on their own, P_tilde is zero there
     q : float
         Required parameter for phase matrix 
     verbose : bool
-        To print each important results calculations
+        To log each important results calculations
+    k : int or None
+        Number of eigenpairs to compute. None computes the full spectrum with a dense
+        eigh, otherwise an iterative sparse Hermitian solver (ARPACK Lanczos) is used
+        and eigenvalues/eigenvectors/GFT/IGFT are restricted to those k modes
+    which : str
+        'SA' for the k smallest eigenvalues (low frequencies), 'LA' for the k largest
+    sigma : float or None
+        If given, shift-invert around sigma and return the k eigenvalues closest
+        to it (a band of the spectrum); overrides which
+    eigsh_tol, eigsh_ncv, eigsh_max_iter : float, int or None, int or None
+        tol, ncv and maxiter of ARPACK (0 / None are the ARPACK defaults). When ARPACK
+        does not converge, LOBPCG and then (N <= DENSE_FALLBACK_MAX_N) a dense eigh of
+        the requested modes are used instead, see spectrum_info['fallback_from']
+    stationary_method, teleport, pi0, redistribute_dangling :
+        Passed to compute_stationary_distribution for the stationary distribution π
+    stationary : tuple or None
+        (π, stationary_info) already computed for this W (e.g. shared by a sweep over q),
+        used instead of solving for π again
+    output_dir : str, Path or None
+        Directory where eigenvalues, eigenvectors, GFT/IGFT and π are saved as
+        memory-mappable .npy files (see load_binary_results), None to skip saving
+    previous : dict or None
+        Results of a previous call (e.g. the previous wind snapshot) with
+        'eigenvectors' and 'stationary_distribution'. π is warm-started from the
+        previous π and the k eigenpairs are refined with LOBPCG seeded by the
+        previous eigenvectors, falling back to a full solve if LOBPCG does not converge
+    warm_tol, warm_max_iter : float, int
+        Residual tolerance and iteration limit of the LOBPCG refinement
+    dtype : numpy dtype
+        Real working precision: np.float32 stores P, P_tilde and Pi in float32 and
+        Gamma_q, L_hrw and the eigenvectors in complex64 (π is always solved in
+        float64). See check_reduced_precision for the accuracy against float64
+    memory_budget : int or None
+        Out-of-core mode, in bytes of working memory per block (None keeps everything
+        in memory). L^q_rw is built on the sparse path whatever the format of W and
+        its intermediates are freed as soon as L^q_rw exists, so a full spectrum only
+        holds the densified L^q_rw (diagonalized in place) and its eigenvectors at
+        once. The eigenvectors are written to output_dir/eigenvectors.npy in column
+        blocks and returned memory-mapped, GFT/IGFT are streamed block by block.
+        Needs output_dir
         
     Returns:
     --------
@@ -24,13 +85,230 @@ def compute_hermitian_random_walk_laplacian(W, q=0.01, verbose=True):
         - eigenvectors: Corresponding eigenvectors (columns)
         - P: Transition matrix
         - Pi: Stationary distribution (diagonal matrix)
+        - stationary_distribution: π as a vector
+        - stationary_info: solver report (method, iterations, residual, converged)
         - P_tilde: Symmetric transition matrix
         - P_tilde_hermitian: Hermitian transition matrix
         - GFT: Graph fourier transform
         - IGFT: Inverse graph fourier transform
+        - spectrum_info: eigensolver report (method, iterations, residual, converged, warm_start,
+          and fallback_from when ARPACK did not converge)
+    In the out-of-core mode P, Pi, P_tilde, P_tilde_hermitian and Gamma_q are None
+    and eigenvectors is a read-only memory map
     """
     
-    N = W.shape[0]
+    if previous is not None and pi0 is None:
+        pi0 = previous.get('stationary_distribution')
+    stationary_options = {'method': stationary_method, 'teleport': teleport, 'pi0': pi0,
+                          'redistribute_dangling': redistribute_dangling}
+    W = W.astype(dtype, copy=False)
+    if memory_budget is not None:
+        if output_dir is None:
+            raise ValueError("the out-of-core mode (memory_budget) needs an output_dir")
+        W = sp.csr_matrix(W)
+    if sp.issparse(W):
+        L_hrw, P, pi, stationary_info, Pi, P_tilde, P_tilde_hermitian, Gamma_q, is_hermitian = \
+            _compute_sparse_laplacian(W, q, stationary_options, stationary)
+        if memory_budget is not None:
+            # Only L^q_rw and π are needed from here on
+            P = Pi = P_tilde = P_tilde_hermitian = Gamma_q = None
+        if verbose:
+            logger.info(f"Stationary distribution: {stationary_info}")
+            logger.info(f"Hermitian P̃ computed")
+            logger.info(f"P̃ is Hermitian: {is_hermitian}")
+            logger.debug(f"L^q_rw shape: {L_hrw.shape} (nnz: {L_hrw.nnz})")
+    else:
+        L_hrw, P, pi, stationary_info, Pi, P_tilde, P_tilde_hermitian, Gamma_q, is_hermitian = \
+            _compute_dense_laplacian(W, q, verbose, stationary_options, stationary)
+
+    # Diagonalizing L^q_rw
+    warm_info = None
+    if previous is not None and k is not None and sigma is None:
+        eigenvalues, eigenvectors, warm_info = _refine_spectrum(
+            L_hrw, previous['eigenvectors'], k, which, warm_tol, warm_max_iter
+        )
+        if verbose:
+            logger.info(f"Warm-started spectrum: {warm_info}")
+    if warm_info is not None and warm_info['converged']:
+        spectrum_info = warm_info
+    elif k is None and memory_budget is not None:
+        # Column-major so that eigh works in place on the densified copy instead of copying it
+        eigenvalues, eigenvectors = linalg.eigh(L_hrw.toarray(order='F'), overwrite_a=True)
+        spectrum_info = _full_solve_info('eigh', warm_info)
+    elif k is None:
+        eigenvalues, eigenvectors = linalg.eigh(L_hrw.toarray() if sp.issparse(L_hrw) else L_hrw)
+        spectrum_info = _full_solve_info('eigh', warm_info)
+    else:
+        # Fallback when the warm start did not converge
+        eigenvalues, eigenvectors, report = _compute_partial_spectrum(
+            L_hrw, k, which, sigma, eigsh_tol, eigsh_ncv, eigsh_max_iter
+        )
+        spectrum_info = _full_solve_info('eigsh', warm_info, report)
+        if verbose:
+            logger.info(f"Partial spectrum: {spectrum_info}")
+    if memory_budget is None:
+        eigenvalues_sorted, eigenvectors_sorted = _sort_spectrum(eigenvalues, eigenvectors)
+        x_gft, x_igft = _compute_signal_transforms(W, eigenvectors_sorted)
+    else:
+        eigenvalues_sorted, eigenvectors_sorted = _store_spectrum(eigenvalues, eigenvectors, output_dir,
+                                                                  memory_budget)
+        del eigenvectors
+        x_gft, x_igft = _compute_signal_transforms(W, eigenvectors_sorted, memory_budget)
+    results = {
+        'L_hrw': L_hrw,
+        'eigenvalues': eigenvalues_sorted,
+        'eigenvectors': eigenvectors_sorted,
+        'P': P,
+        'Pi': Pi,
+        'stationary_distribution': pi,
+        'stationary_info': stationary_info,
+        'spectrum_info': spectrum_info,
+        'P_tilde': P_tilde,
+        'P_tilde_hermitian': P_tilde_hermitian,
+        'Gamma_q': Gamma_q,
+        'is_hermitian': is_hermitian,
+        'q': q,
+        'GFT' : x_gft,
+        'IGFT' : x_igft 
+    }
+    if output_dir is not None:
+        binary_results = {
+            'eigenvalues': eigenvalues_sorted,
+            'eigenvectors': eigenvectors_sorted,
+            'stationary_distribution': pi,
+            'GFT': x_gft,
+            'IGFT': x_igft
+        }
+        if sp.issparse(L_hrw):
+            # Stored as CSR components
+            binary_results['L_hrw'] = L_hrw
+        save_binary_results(binary_results, output_dir,
+                            metadata={'is_hermitian': bool(is_hermitian), 'q': q, 'k': k})
+   
+    return results
+
+
+
+def compute_stationary_distribution(P, method='power', tol=1e-10, max_iter=10000, teleport=0.0, pi0=None,
+                                    redistribute_dangling=False):
+    """
+    Stationary distribution π of the random walk with transition matrix P (πP = π)
+    Parameters:
+    -----------
+    P : numpy.ndarray or scipy.sparse matrix
+        Row-stochastic transition matrix (N x N), rows of zeros (dangling nodes) allowed
+    method : str
+        'power' : sparse power iteration, lazy (x <- (x + xP)/2) when teleport is 0 so
+                  that periodic chains still converge. Mass reaching a dangling node is
+                  lost and π renormalized, so with teleport 0 and no redistribution π
+                  is the leading left eigenvector of P itself (as 'eig')
+        'solve' : sparse direct solve of (I - (1 - teleport) P^T) y = 1/N, needs teleport > 0;
+                  its normalized solution is the chain with dangling rows redistributed
+        'eig'   : legacy eigenvector of P^T with eigenvalue closest to 1
+                  (ignores teleport and dangling nodes)
+    tol : float
+        Stop when the L1 change of π over one step is below tol
+    max_iter : int
+        Maximum number of power iterations
+    teleport : float
+        Probability of jumping to a uniformly random node at each step, makes
+        reducible chains irreducible (0 disables teleportation)
+    pi0 : numpy.ndarray or None
+        Starting vector for the power iteration, e.g. π from a previous run
+    redistribute_dangling : bool
+        Dangling nodes jump to the uniform distribution instead of losing their mass.
+        Like teleport this changes the chain: π is then stationary for the modified
+        chain, not for P, while L^q_rw is still built from P
+
+    Returns:
+    --------
+    pi : numpy.ndarray
+        Stationary distribution normalized to sum 1
+    info : dict
+        method, iterations, residual (L1 norm of πG - π for the effective chain G)
+        and converged
+    """
+    N = P.shape[0]
+    PT = P.T.tocsr() if sp.issparse(P) else P.T
+    dangling = np.asarray(P.sum(axis=1)).ravel() == 0
+    uniform = np.full(N, 1.0 / N)
+
+    redistribute = redistribute_dangling or method == 'solve'
+
+    def step(x):
+        # One step of the chain with dangling rows (when redistributed) and teleportation folded in
+        x_next = PT @ x
+        if redistribute:
+            x_next = x_next + uniform * x[dangling].sum()
+        return (1 - teleport) * x_next + teleport * uniform
+
+    iterations = 0
+    converged = True
+    if method == 'power':
+        pi = uniform if pi0 is None else np.asarray(pi0, dtype=float) / np.sum(pi0)
+        converged = False
+        for iterations in range(1, max_iter + 1):
+            pi_next = step(pi)
+            total = pi_next.sum()
+            if total == 0:
+                # All the mass sits on dangling nodes: P has no recurrent class to converge to
+                break
+            # Renormalized, as mass lost at dangling nodes is not a change of the distribution
+            change = np.abs(pi_next / total - pi).sum()
+            if teleport == 0:
+                # Lazy step: same fixed point, no oscillation on periodic chains
+                pi_next = 0.5 * (pi + pi_next)
+            pi = pi_next / pi_next.sum()
+            if change < tol:
+                converged = True
+                break
+    elif method == 'solve':
+        if teleport <= 0:
+            raise ValueError("method='solve' needs teleport > 0")
+        A = sp.identity(N, format='csc') - (1 - teleport) * sp.csc_matrix(PT)
+        pi = sparse_linalg.spsolve(A, uniform)
+        pi = pi / pi.sum()
+    elif method == 'eig':
+        if sp.issparse(P):
+            # Shift-invert just above 1 so that (P^T - sigma*I) stays factorizable
+            _, eigenvectors_P = sparse_linalg.eigs(P.T.tocsc(), k=1, sigma=1.0 + 1e-6)
+            pi = np.real(eigenvectors_P[:, 0])
+        else:
+            eigenvalues_P, eigenvectors_P = linalg.eig(P.T)
+            idx = np.argmin(np.abs(eigenvalues_P - 1))
+            pi = np.real(eigenvectors_P[:, idx])
+        pi = pi / pi.sum()
+        residual = float(np.abs(PT @ pi - pi).sum())
+        return pi, {'method': method, 'iterations': iterations, 'residual': residual, 'converged': converged}
+    else:
+        raise ValueError(f"Unknown stationary distribution method: {method}")
+
+    residual = float(np.abs(step(pi) - pi).sum())
+    if not converged:
+        logger.warning(f"Stationary distribution did not converge (residual {residual:.3g}): P may have "
+                       f"no recurrent class, see redistribute_dangling and teleport")
+    return pi, {'method': method, 'iterations': iterations, 'residual': residual, 'converged': converged}
+
+
+def _compute_dense_laplacian(W, q, verbose, stationary_options, stationary=None):
+    """
+    Dense construction of L^q_rw and its intermediates from a numpy adjacency matrix
+    """
+    P, pi, stationary_info, Pi, P_tilde = _compute_dense_transition(W, stationary_options, stationary)
+    if verbose:
+        logger.info(f"Stationary distribution: {stationary_info}")
+    L_hrw, P_tilde_hermitian, Gamma_q, is_hermitian = _compute_dense_hermitian(W, q, Pi, P_tilde)
+    if verbose:
+        logger.info(f"Hermitian P̃ computed")
+        logger.info(f"P̃ is Hermitian: {is_hermitian}")
+        logger.debug(f"L^q_rw shape: {L_hrw.shape}")
+    return L_hrw, P, pi, stationary_info, Pi, P_tilde, P_tilde_hermitian, Gamma_q, is_hermitian
+
+
+def _compute_dense_transition(W, stationary_options, stationary=None):
+    """
+    q-independent part of the dense construction: P, π, Π and P_tilde
+    """
     out_degree = W.sum(axis=1)
     
     # Handle nodes with zero out-degree to avoid division by zero
@@ -38,19 +316,20 @@ def compute_hermitian_random_walk_laplacian(W, q=0.01, verbose=True):
     # Transition probabilities
     P = W / out_degree[:, np.newaxis]
 
-    # Solve πP = π (or equivalently P^T π = π)
-    # This is the left eigenvector of P with eigenvalue 1
-    eigenvalues_P, eigenvectors_P = linalg.eig(P.T)
-    
-    # Find eigenvector corresponding to eigenvalue = 1
-    idx = np.argmin(np.abs(eigenvalues_P - 1))
-    pi = np.real(eigenvectors_P[:, idx])
-    # Normalize so that sum = 1
-    pi = pi / pi.sum()
+    # Solve πP = π (or equivalently P^T π = π), unless π is given
+    pi, stationary_info = stationary or compute_stationary_distribution(P, **stationary_options)
     # Create diagonal matrix Π
-    Pi = np.diag(pi)
+    Pi = np.diag(pi.astype(P.dtype))
     P_tilde = 0.5 * (Pi @ P + P.T @ Pi)
-    Gamma_q = np.ones((N, N), dtype=complex)
+    return P, pi, stationary_info, Pi, P_tilde
+
+
+def _compute_dense_hermitian(W, q, Pi, P_tilde):
+    """
+    q-dependent part of the dense construction: Gamma_q, Hermitian P_tilde and L^q_rw
+    """
+    N = W.shape[0]
+    Gamma_q = np.ones((N, N), dtype=np.result_type(P_tilde.dtype, np.complex64))
     for i in range(N):
         for j in range(N):
             if i != j:
@@ -63,50 +342,221 @@ def compute_hermitian_random_walk_laplacian(W, q=0.01, verbose=True):
     P_tilde_hermitian = Gamma_q * P_tilde
     # Check Hermitian property: P̃ = P̃^H
     is_hermitian = np.allclose(P_tilde_hermitian, P_tilde_hermitian.conj().T)
-    if verbose:
-        print(f"Hermitian P̃ computed")
-        print(f"P̃ is Hermitian: {is_hermitian}")
     
     # Computing Laplacian
     L_hrw = Pi - P_tilde_hermitian
-    if verbose:
-        print(f"L^q_rw shape: {L_hrw.shape}")
-    
-    # Diagonalizing L^q_rw
-    eigenvalues, eigenvectors = linalg.eigh(L_hrw)
+    return L_hrw, P_tilde_hermitian, Gamma_q, is_hermitian
+
+
+def _compute_sparse_laplacian(W, q, stationary_options, stationary=None):
+    """
+    Sparse construction of L^q_rw and its intermediates, O(edges) in time and memory
+    Pi is only ever applied as a diagonal and Gamma_q is built on the nonzero
+    pattern of W + W^T, where P_tilde can be nonzero
+    """
+    W = sp.csr_matrix(W, dtype=np.result_type(W.dtype, np.float32))
+    P, pi, stationary_info, Pi, P_tilde = _compute_sparse_transition(W, stationary_options, stationary)
+    L_hrw, P_tilde_hermitian, Gamma_q, is_hermitian = _compute_sparse_hermitian(W, q, Pi, P_tilde)
+    return L_hrw, P, pi, stationary_info, Pi, P_tilde, P_tilde_hermitian, Gamma_q, is_hermitian
+
+
+def _compute_sparse_transition(W, stationary_options, stationary=None):
+    """
+    q-independent part of the sparse construction: P, π, Π and P_tilde
+    """
+    out_degree = np.asarray(W.sum(axis=1)).ravel()
+
+    # Handle nodes with zero out-degree to avoid division by zero
+    out_degree[out_degree == 0] = 1
+    # Transition probabilities
+    P = sp.diags(1 / out_degree) @ W
+
+    # Solve πP = π (or equivalently P^T π = π), unless π is given
+    pi, stationary_info = stationary or compute_stationary_distribution(P, **stationary_options)
+    Pi = sp.diags(pi.astype(P.dtype))
+    P_tilde = (0.5 * (Pi @ P + P.T @ Pi)).tocsr()
+    return P, pi, stationary_info, Pi, P_tilde
+
+
+def _compute_sparse_hermitian(W, q, Pi, P_tilde):
+    """
+    q-dependent part of the sparse construction: Gamma_q, Hermitian P_tilde and L^q_rw
+    """
+    # Phase exp(i*pi*q*(W_ij - W_ji)) wherever W_ij > 0 or W_ji > 0. Outside that pattern
+    # the dense Gamma_q is 1 but this one holds implicit zeros: P_tilde is zero there,
+    # so those entries never enter P_tilde_hermitian
+    pattern = ((W > 0) + (W.T > 0)).astype(np.result_type(W.dtype, np.complex64))
+    phase_shift = (1j * q * np.pi * (W - W.T)).expm1().multiply(pattern)
+    Gamma_q = (pattern + phase_shift).tocsr()
+
+    # Hadamard product Gamma_q * P_tilde, written as P_tilde + P_tilde * (Gamma_q - 1) on the pattern
+    P_tilde_hermitian = (P_tilde + P_tilde.multiply(phase_shift)).tocsr()
+    # Check Hermitian property: P̃ = P̃^H
+    is_hermitian = np.allclose((P_tilde_hermitian - P_tilde_hermitian.conj().T).data, 0)
+
+    # Computing Laplacian
+    L_hrw = (Pi - P_tilde_hermitian).tocsr()
+    return L_hrw, P_tilde_hermitian, Gamma_q, is_hermitian
+
+
+def _sort_spectrum(eigenvalues, eigenvectors):
+    """
+    Real eigenvalues in ascending order with their eigenvectors
+    """
     # Eigenvalues should be real and non-negative
     eigenvalues_real = np.real(eigenvalues)
     
     # Sort in ascending order
     sort_idx = np.argsort(eigenvalues_real)
-    eigenvalues_sorted = eigenvalues_real[sort_idx]
-    eigenvectors_sorted = eigenvectors[:, sort_idx]
+    return eigenvalues_real[sort_idx], eigenvectors[:, sort_idx]
+
+
+def _store_spectrum(eigenvalues, eigenvectors, output_dir, memory_budget):
+    """
+    Out-of-core counterpart of _sort_spectrum: the eigenvectors are written in ascending
+    eigenvalue order to output_dir/eigenvectors.npy block by block and reopened memory-mapped
+    """
+    eigenvalues_real = np.real(eigenvalues)
+    sort_idx = np.argsort(eigenvalues_real)
+    eigenvectors_file = save_blocked_matrix(eigenvectors, Path(output_dir) / "eigenvectors.npy",
+                                            memory_budget, columns=sort_idx)
+    return eigenvalues_real[sort_idx], np.load(eigenvectors_file, mmap_mode='r')
+
 
-    signal= np.sum(W, axis=1).reshape(-1)
-    # GFT
+def _compute_signal_transforms(W, eigenvectors, memory_budget=None):
+    """
+    GFT and IGFT of the out-degree signal of W (restricted to the computed modes when k is given)
+    With a memory_budget the eigenvectors are streamed in column blocks (compute_batched_gft)
+    """
+    signal= np.asarray(W.sum(axis=1)).reshape(-1)
+    if memory_budget is not None:
+        transforms = compute_batched_gft(eigenvectors, signal, memory_budget=memory_budget)
+        return transforms['GFT'].ravel(), transforms['IGFT'].ravel()
     x_gft = eigenvectors.conj().T @ signal   
     # IGFT
     x_igft = eigenvectors @ x_gft  
-    results = {
-        'L_hrw': L_hrw,
-        'eigenvalues': eigenvalues_sorted,
-        'eigenvectors': eigenvectors_sorted,
-        'P': P,
-        'Pi': Pi,
-        'stationary_distribution': pi,
-        'P_tilde': P_tilde,
-        'P_tilde_hermitian': P_tilde_hermitian,
-        'Gamma_q': Gamma_q,
-        'is_hermitian': is_hermitian,
-        'q': q,
-        'GFT' : x_gft,
-        'IGFT' : x_igft 
-    }
-    json_ready = to_jsonable({'eigenvalues': eigenvalues_sorted,
-        'eigenvectors': eigenvectors_sorted,'is_hermitian': is_hermitian})
-    with open("output/hermitian_rw_results.json", "w") as f:
-        json.dump(json_ready, f, indent=2)
-   
-    return results
+    return x_gft, x_igft
+
+
+def _compute_partial_spectrum(L_hrw, k, which, sigma, tol=0.0, ncv=None, max_iter=None):
+    """
+    k eigenpairs of the Hermitian L^q_rw with ARPACK (Lanczos), without a full eigendecomposition
+    When ARPACK fails or does not converge (e.g. 'SA' on the large near-zero eigenvalue cluster
+    of graphs whose stationary mass sits on a few cycles) the k eigenpairs are computed
+    with LOBPCG from a seeded random block, then if that does not converge either and
+    N <= DENSE_FALLBACK_MAX_N with a dense eigh restricted to the requested modes.
+    The dense eigh is also used when k is too large for ARPACK (k >= N - 1)
+    Returns (eigenvalues, eigenvectors, info), info as in _full_solve_info; the
+    ARPACK error is re-raised when no fallback applies (sigma with N > DENSE_FALLBACK_MAX_N)
+    """
+    N = L_hrw.shape[0]
+    if k >= N - 1:
+        eigenvalues, eigenvectors = _compute_dense_partial_spectrum(L_hrw, k, which, sigma)
+        return eigenvalues, eigenvectors, _solve_report('eigh', L_hrw, eigenvalues, eigenvectors)
+    try:
+        if sigma is not None:
+            # Shift-invert: the eigenvalues closest to sigma converge first
+            eigenvalues, eigenvectors = sparse_linalg.eigsh(L_hrw, k=k, sigma=sigma, which='LM',
+                                                            tol=tol, ncv=ncv, maxiter=max_iter)
+        else:
+            eigenvalues, eigenvectors = sparse_linalg.eigsh(L_hrw, k=k, which=which,
+                                                            tol=tol, ncv=ncv, maxiter=max_iter)
+        return eigenvalues, eigenvectors, _solve_report('eigsh', L_hrw, eigenvalues, eigenvectors)
+    except sparse_linalg.ArpackNoConvergence as e:
+        failure = e
+        arpack_report = f"{len(e.eigenvalues)} of {k} eigenpairs converged"
+    except sparse_linalg.ArpackError as e:
+        # e.g. error 3, no shifts could be applied on a degenerate cluster
+        failure = e
+        arpack_report = str(e).strip()
+    logger.warning(f"ARPACK failed ({arpack_report}), falling back")
+
+    report = None
+    if sigma is None and 5 * k < N:
+        rng = np.random.default_rng(0)
+        X = rng.standard_normal((N, k)).astype(L_hrw.dtype)
+        if np.iscomplexobj(X):
+            X += 1j * rng.standard_normal((N, k))
+        eigenvalues, eigenvectors, report = _lobpcg_spectrum(
+            L_hrw, X, which, tol or LOBPCG_TOL, max_iter or LOBPCG_MAX_ITER
+        )
+        if report['converged'] or N > DENSE_FALLBACK_MAX_N:
+            if not report['converged']:
+                logger.warning(f"LOBPCG did not converge either (residual {report['residual']:.3g})")
+            return eigenvalues, eigenvectors, {**report, 'fallback_from': 'eigsh', 'eigsh': arpack_report}
+    if N > DENSE_FALLBACK_MAX_N:
+        raise failure
+    eigenvalues, eigenvectors = _compute_dense_partial_spectrum(L_hrw, k, which, sigma)
+    info = _solve_report('eigh', L_hrw, eigenvalues, eigenvectors)
+    info.update({'fallback_from': 'eigsh', 'eigsh': arpack_report})
+    if report is not None:
+        info['lobpcg_residual'] = report['residual']
+    return eigenvalues, eigenvectors, info
+
+
+def _compute_dense_partial_spectrum(L_hrw, k, which, sigma):
+    """
+    k eigenpairs of L^q_rw from a dense eigh, only the requested modes are computed
+    unless sigma is given
+    """
+    N = L_hrw.shape[0]
+    k = min(k, N)
+    L_dense = L_hrw.toarray() if sp.issparse(L_hrw) else L_hrw
+    if sigma is not None:
+        eigenvalues, eigenvectors = linalg.eigh(L_dense)
+        keep = np.argsort(np.abs(eigenvalues - sigma), kind='stable')[:k]
+        return eigenvalues[keep], eigenvectors[:, keep]
+    subset = [N - k, N - 1] if which == 'LA' else [0, k - 1]
+    return linalg.eigh(L_dense, subset_by_index=subset)
+
+
+def _refine_spectrum(L_hrw, X0, k, which, tol, max_iter):
+    """
+    Refine the k eigenpairs of L^q_rw with LOBPCG, seeded by a previous eigenbasis X0
+    Returns (eigenvalues, eigenvectors, info); info['converged'] is False when the
+    residuals stay above tol, or when the block is too large for LOBPCG (5k >= N)
+    """
+    N = L_hrw.shape[0]
+    X0 = np.asarray(X0)
+    if X0.shape != (N, k) or 5 * k >= N:
+        # Previous basis from a different graph size or block too large for LOBPCG
+        info = {'method': None, 'iterations': 0, 'residual': None, 'converged': False, 'warm_start': True}
+        return None, None, info
+    eigenvalues, eigenvectors, info = _lobpcg_spectrum(L_hrw, np.array(X0, dtype=L_hrw.dtype), which, tol, max_iter)
+    info['warm_start'] = True
+    return eigenvalues, eigenvectors, info
+
+
+def _lobpcg_spectrum(L_hrw, X, which, tol, max_iter):
+    """
+    LOBPCG eigenpairs of L^q_rw from the block X, converged when the largest residual
+    ||L v - lambda v|| is at most tol * max(1, |lambda|max)
+    """
+    eigenvalues, eigenvectors, residual_history = sparse_linalg.lobpcg(
+        L_hrw, X, tol=tol, maxiter=max_iter, largest=(which == 'LA'), retResidualNormsHistory=True
+    )
+    info = _solve_report('lobpcg', L_hrw, eigenvalues, eigenvectors)
+    info['iterations'] = len(residual_history)
+    info['converged'] = bool(info['residual'] <= tol * max(1.0, np.abs(eigenvalues).max()))
+    return eigenvalues, eigenvectors, info
+
+
+def _solve_report(method, L_hrw, eigenvalues, eigenvectors):
+    """
+    Solver report with the largest residual ||L v - lambda v|| of the computed eigenpairs
+    """
+    residuals = np.linalg.norm(L_hrw @ eigenvectors - eigenvectors * eigenvalues, axis=0)
+    return {'method': method, 'iterations': None, 'residual': float(residuals.max()), 'converged': True}
 
 
+def _full_solve_info(method, warm_info, report=None):
+    """
+    Report for a solve from scratch, keeping the iterations of a failed warm start
+    report: solver report of a partial spectrum (_compute_partial_spectrum)
+    """
+    info = {'method': method, 'iterations': None, 'residual': None, 'converged': True, 'warm_start': False}
+    info.update(report or {})
+    if warm_info is not None:
+        info['warm_start_iterations'] = warm_info['iterations']
+        info['warm_start_residual'] = warm_info['residual']
+    return info
@@ -0,0 +1,26 @@
+import numpy as np
+
+def compute_pairwise_geometry(lat1, lon1, lat2, lon2):
+    """
+    Vectorized haversine distance and bearing from point(s) 1 to point(s) 2
+    Inputs are in decimal degrees and broadcast against each other, so a
+    (B, 1) block of sources against a (1, N) row of targets gives (B, N) results
+    Returns:
+        distances: great circle distances in kilometers
+        bearings: bearings from point 1 to point 2 in degrees (0-359)
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    cos_lat1 = np.cos(lat1)
+    cos_lat2 = np.cos(lat2)
+
+    # Haversine formula (same as haversine_distance)
+    a = np.sin(dlat / 2)**2 + cos_lat1 * cos_lat2 * np.sin(dlon / 2)**2
+    distances = 2 * np.arcsin(np.sqrt(a)) * 6371
+
+    # Bearing (same as calculate_bearing)
+    x = np.sin(dlon) * cos_lat2
+    y = cos_lat1 * np.sin(lat2) - np.sin(lat1) * cos_lat2 * np.cos(dlon)
+    bearings = (np.degrees(np.arctan2(x, y)) + 360) % 360
+    return distances, bearings
@@ -0,0 +1,31 @@
+from collections import defaultdict
+import numpy as np
+
+def encode_graph(graph):
+    """
+    Flatten a graph of {city: [edge dicts]} into arrays (one entry per edge) for storage
+    """
+    edges = [(source, edge) for source, source_edges in graph.items() for edge in source_edges]
+    return {
+        'source': np.array([source for source, _ in edges], dtype=str),
+        'city': np.array([edge['city'] for _, edge in edges], dtype=str),
+        'distance': np.array([edge['distance'] for _, edge in edges], dtype=float),
+        'bearing': np.array([edge['bearing'] for _, edge in edges], dtype=float),
+        'segment': np.array([edge['segment'] for _, edge in edges], dtype=np.int64)
+    }
+
+
+def decode_graph(arrays):
+    """
+    Rebuild the {city: [edge dicts]} graph written by encode_graph
+    """
+    graph = defaultdict(list)
+    for source, city, distance, bearing, segment in zip(
+            arrays['source'], arrays['city'], arrays['distance'], arrays['bearing'], arrays['segment']):
+        graph[str(source)].append({
+            'city': str(city),
+            'distance': float(distance),
+            'bearing': float(bearing),
+            'segment': int(segment)
+        })
+    return graph
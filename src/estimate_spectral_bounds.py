@@ -0,0 +1,23 @@
+import numpy as np
+import scipy.sparse as sp
+
+def estimate_spectral_bounds(L):
+    """
+    Cheap interval containing the spectrum of a Hermitian matrix (Gershgorin discs)
+    Parameters:
+        L: Hermitian (N x N) matrix, sparse or dense
+    Returns:
+        (lambda_min, lambda_max) bounds on the eigenvalues of L
+    """
+    diagonal = np.real(L.diagonal())
+    if sp.issparse(L):
+        abs_row_sums = np.asarray(abs(L).sum(axis=1)).ravel()
+    else:
+        abs_row_sums = np.abs(L).sum(axis=1)
+    radius = abs_row_sums - np.abs(diagonal)
+    lambda_min = float(np.min(diagonal - radius))
+    lambda_max = float(np.max(diagonal + radius))
+    if lambda_max <= lambda_min:
+        # Scalar multiple of the identity, widen so the interval is not degenerate
+        lambda_min, lambda_max = lambda_min - 1, lambda_max + 1
+    return lambda_min, lambda_max
@@ -1,29 +1,69 @@
-from load_cached_coordinates import load_cached_coordinates
-from save_coordinates_cache import save_coordinates_cache
-from get_city_coordinates import get_city_coordinates
+import logging
+import pandas as pd
+from .load_geocoding_cache import load_geocoding_cache, GEOCODING_CACHE_FILE
+from .append_geocoding_cache import append_geocoding_cache
+from .get_city_coordinates import resolve_city_coordinates
+from .load_gazetteer import load_gazetteer
+from .geocode_with_gazetteer import geocode_with_gazetteer
+logger = logging.getLogger(__name__)
 
-def fetch_all_coordinates(df, use_cache=True):
+def fetch_all_coordinates(df, use_cache=True, geocoder=None, requests_per_second=1.0, max_workers=4,
+                          cache_file=GEOCODING_CACHE_FILE, gazetteer=None, online_fallback=True):
     """
     Fetch coordinates for all unique cities in the dataframe
+    Only (district, state) pairs missing from the cache are geocoded, and every
+    resolved city is appended to the cache as soon as it is found
+    Parameters:
+        df: DataFrame with 'District' and 'State' columns
+        use_cache: look up cached coordinates before geocoding
+        geocoder: geopy style backend (Nominatim by default), e.g. a local stand-in for tests
+        requests_per_second: geocoding request budget
+        max_workers: number of concurrent geocoding lookups
+        cache_file: json-lines geocoding cache
+        gazetteer: gazetteer file or index from load_gazetteer, resolves cache misses
+                   offline in one batch before any online lookup
+        online_fallback: geocode places the gazetteer could not resolve online (Nominatim);
+                         disable on machines without network access
     Returns a dictionary of {city: (lat, lon)}
     """
 
-    # Get unique cities from dataframe
-    cities = df['District'].dropna().unique().tolist()
+    # Unique cities with the state of their first row, in dataframe order
+    places = df.dropna(subset=['District']).drop_duplicates('District')[['District', 'State']]
+    places = [
+        (city, None if pd.isna(state) else state)
+        for city, state in places.itertuples(index=False)
+    ]
 
     # Load cache if enabled
-    coordinates = load_cached_coordinates() if use_cache else {}
+    cache = load_geocoding_cache(cache_file) if use_cache else {}
 
-    if(coordinates == {}):
-        for idx, city in enumerate(cities, 1):
-            rows = df[df['District'] == city]
-            if rows.empty:
-                print(f"State not found for city: {city}")
-                continue
-            state = rows['State'].iloc[0]
-            coords = get_city_coordinates(city, state)
+    found = {}
+    missing = []
+    for city, state in places:
+        coords = cache.get((city, state)) or cache.get((city, None))
+        if coords:
+            found[city] = tuple(coords)
+        else:
+            missing.append((city, state))
+
+    if missing and gazetteer is not None:
+        if not isinstance(gazetteer, dict):
+            gazetteer = load_gazetteer(gazetteer)
+        missing_df = pd.DataFrame(missing, columns=['District', 'State'])
+        resolved, missing = geocode_with_gazetteer(missing_df, gazetteer)
+        for (city, state), coords in resolved.items():
+            found[city] = coords
+        append_geocoding_cache(
+            [(city, state, coords) for (city, state), coords in resolved.items()], cache_file
+        )
+
+    if missing and online_fallback:
+        logger.info(f"Geocoding {len(missing)} cities missing from the cache")
+        for (city, state), coords in resolve_city_coordinates(
+                missing, geocoder, requests_per_second, max_workers):
             if coords:
-                coordinates[city] = coords
-            save_coordinates_cache(coordinates)
+                found[city] = coords
+                append_geocoding_cache([(city, state, coords)], cache_file)
 
-    return coordinates, df
\ No newline at end of file
+    coordinates = {city: found[city] for city, _ in places if city in found}
+    return coordinates, df
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+# Bounding box of India as (min, max) latitude and longitude
+INDIA_LAT_RANGE = (8.0, 37.0)
+INDIA_LON_RANGE = (68.0, 97.5)
+
+def generate_synthetic_wind_data(n_districts, seed=0, max_speed=10.0, n_states=36):
+    """
+    Random districts inside India's bounding box with random wind readings,
+    shaped like the output of load_wind_data and fetch_all_coordinates
+    Parameters:
+        n_districts: number of districts
+        seed: seed of the random generator, the same seed gives the same data
+        max_speed: wind speeds are drawn uniformly from [0, max_speed] m/s
+        n_states: districts are spread round-robin over this many states
+    Returns:
+        df: DataFrame with 'State', 'District', 'Speed (in m/s)', 'Direction (in ° angle)'
+        coordinates: dict of {district: (lat, lon)}
+    """
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(*INDIA_LAT_RANGE, n_districts)
+    lons = rng.uniform(*INDIA_LON_RANGE, n_districts)
+    districts = [f"District {i}" for i in range(n_districts)]
+    df = pd.DataFrame({
+        'State': [f"State {i % n_states}" for i in range(n_districts)],
+        'District': districts,
+        'Speed (in m/s)': np.round(rng.uniform(0, max_speed, n_districts), 1),
+        'Direction (in ° angle)': np.round(rng.uniform(0, 360, n_districts), 0)
+    })
+    coordinates = {district: (float(lat), float(lon)) for district, lat, lon in zip(districts, lats, lons)}
+    return df, coordinates
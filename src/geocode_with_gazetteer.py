@@ -0,0 +1,64 @@
+import logging
+import difflib
+import pandas as pd
+from .normalize_place_name import normalize_place_name
+logger = logging.getLogger(__name__)
+
+def geocode_with_gazetteer(df, gazetteer, fuzzy_cutoff=0.85):
+    """
+    Resolve the District/State columns of a DataFrame against a gazetteer in one batch
+    Names are matched after normalization, first exactly and then fuzzily (difflib
+    ratio >= fuzzy_cutoff) within the state, then exactly and fuzzily among the names
+    of the whole gazetteer. The last two only use names found in a single state, so a
+    district name shared by several states (e.g. Aurangabad, Bilaspur) never resolves
+    to another state. Each exact match falls back to the names without administrative
+    suffix words (e.g. "Pune Dist." for "Pune"), which never merges two places such
+    as "Bangalore Urban" and "Bangalore Rural"
+    Parameters:
+        df: DataFrame with 'District' and 'State' columns
+        gazetteer: index returned by load_gazetteer
+        fuzzy_cutoff: minimum similarity for a fuzzy match (1 disables fuzzy matching)
+    Returns:
+        resolved: dict of {(district, state): (lat, lon)}
+        unresolved: list of (district, state) pairs without a match
+    """
+    places = df.dropna(subset=['District']).drop_duplicates(['District', 'State'])
+    districts = places['District'].tolist()
+    states = [None if pd.isna(state) else state for state in places['State']]
+    names = places['District'].map(normalize_place_name).tolist()
+    short_names = places['District'].map(lambda name: normalize_place_name(name, strip_suffixes=True)).tolist()
+    state_names = places['State'].map(lambda state: normalize_place_name(state, strip_suffixes=True)).tolist()
+
+    exact = gazetteer['exact']
+    by_name = gazetteer['by_name']
+    stripped = gazetteer['stripped']
+    stripped_by_name = gazetteer['stripped_by_name']
+    ambiguous = gazetteer['ambiguous']
+    unique_names = [name for name in gazetteer['names'] if name not in ambiguous]
+    resolved = {}
+    unresolved = []
+    for district, state, name, short_name, state_name in zip(districts, states, names, short_names, state_names):
+        coords = exact.get((name, state_name))
+        if coords is None:
+            coords = stripped.get((short_name, state_name))
+        fuzzy = fuzzy_cutoff < 1 and name
+        if coords is None and fuzzy:
+            candidates = gazetteer['names_by_state'].get(state_name, [])
+            match = difflib.get_close_matches(name, candidates, n=1, cutoff=fuzzy_cutoff)
+            if match:
+                coords = exact[(match[0], state_name)]
+        if coords is None and name not in ambiguous:
+            coords = by_name.get(name)
+        if coords is None:
+            coords = stripped_by_name.get(short_name)
+        if coords is None and fuzzy:
+            match = difflib.get_close_matches(name, unique_names, n=1, cutoff=fuzzy_cutoff)
+            if match:
+                coords = by_name[match[0]]
+        if coords is None:
+            unresolved.append((district, state))
+        else:
+            resolved[(district, state)] = coords
+
+    logger.info(f"Gazetteer resolved {len(resolved)} places, {len(unresolved)} unresolved")
+    return resolved, unresolved
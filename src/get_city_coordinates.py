@@ -1,16 +1,28 @@
-try:
-    from geopy.geocoders import Nominatim
-    from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-    import time
-except ImportError:
-    print("WARNING: geopy not installed")
-geolocator = Nominatim(user_agent="city_graph_builder_v1")
+import logging
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+logger = logging.getLogger(__name__)
+# Nominatim client, created on first use so geopy is only imported when it is needed
+geolocator = None
 
-def get_city_coordinates(city_name, state_name, max_retries=2):
+def get_city_coordinates(city_name, state_name, max_retries=2, geocoder=None, rate_limiter=None):
     """
     Get coordinates for a city using geopy
+    Parameters:
+        city_name, state_name: place to look up
+        max_retries: attempts per query format
+        geocoder: geopy style backend with geocode(query, timeout=...), Nominatim by default
+        rate_limiter: callable invoked before every request, defaults to a fixed 1.1 s sleep
     Returns (latitude, longitude) or None if not found
     """
+    global geolocator
+    if geocoder is None:
+        if geolocator is None:
+            from geopy.geocoders import Nominatim
+            geolocator = Nominatim(user_agent="city_graph_builder_v1")
+        geocoder = geolocator
+    GeocoderTimedOut, GeocoderServiceError = _geopy_errors()
     # Try different query formats for better results
     queries = [
         f"{city_name}, {state_name}, India",
@@ -22,24 +34,78 @@ def get_city_coordinates(city_name, state_name, max_retries=2):
         for attempt in range(max_retries):
             try:
                 # Add delay to avoid rate limiting
-                time.sleep(1.1)
-                location = geolocator.geocode(query, timeout=10)
+                if rate_limiter is None:
+                    time.sleep(1.1)
+                else:
+                    rate_limiter()
+                location = geocoder.geocode(query, timeout=10)
                 if location:
-                    print(f"  ✓ Found: {city_name} → ({location.latitude:.4f}, {location.longitude:.4f})")
+                    logger.debug(f"✓ Found: {city_name} → ({location.latitude:.4f}, {location.longitude:.4f})")
                     return (location.latitude, location.longitude)
                 
             except GeocoderTimedOut:
                 if attempt < max_retries - 1:
-                    print(f"Timeout for {city_name}, retrying...")
+                    logger.warning(f"Timeout for {city_name}, retrying...")
                     time.sleep(1.5)
                 else:
-                    print(f"  ✗ Timeout: {city_name} (after {max_retries} attempts)")
+                    logger.warning(f"✗ Timeout: {city_name} (after {max_retries} attempts)")
             except GeocoderServiceError as e:
-                print(f" ✗ Service error for {city_name}: {e}")
+                logger.warning(f"✗ Service error for {city_name}: {e}")
                 break
             except Exception as e:
-                print(f"  ✗ Error for {city_name}: {e}")
+                logger.warning(f"✗ Error for {city_name}: {e}")
                 break
     
-    print(f"  ✗ {city_name}: Not found")
+    logger.warning(f"✗ {city_name}: Not found")
     return None
+
+
+def resolve_city_coordinates(places, geocoder=None, requests_per_second=1.0, max_workers=4, max_retries=2):
+    """
+    Geocode many places concurrently while respecting a shared requests-per-second budget
+    Parameters:
+        places: list of (city_name, state_name)
+        geocoder: geopy style backend shared by all workers, Nominatim by default
+        requests_per_second: request budget across all workers (Nominatim allows 1)
+        max_workers: number of concurrent lookups
+        max_retries: attempts per query format
+    Yields:
+        ((city_name, state_name), coordinates or None) as lookups complete
+    """
+    rate_limiter = make_rate_limiter(requests_per_second)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(get_city_coordinates, city, state, max_retries, geocoder, rate_limiter): (city, state)
+            for city, state in places
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def make_rate_limiter(requests_per_second):
+    """
+    Thread-safe limiter: each call blocks until the next request slot is free
+    """
+    interval = 1.0 / requests_per_second
+    lock = threading.Lock()
+    next_slot = [time.monotonic()]
+
+    def wait():
+        with lock:
+            now = time.monotonic()
+            slot = max(now, next_slot[0])
+            next_slot[0] = slot + interval
+        time.sleep(max(0.0, slot - now))
+    return wait
+
+
+def _geopy_errors():
+    """
+    geopy's timeout and service exception classes, or empty tuples (never raised)
+    without geopy so that the except clauses stay valid for other backends
+    """
+    try:
+        from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+    except ImportError:
+        return (), ()
+    return GeocoderTimedOut, GeocoderServiceError
@@ -0,0 +1,260 @@
+import heapq
+from collections import defaultdict
+import numpy as np
+import scipy.sparse as sp
+from .build_graph import select_source_edges
+from .compute_pairwise_geometry import compute_pairwise_geometry
+from .align_wind_to_cities import align_wind_to_cities
+
+class IncrementalWindGraph:
+    """
+    Geometric graph (build_graph) and wind adjacency (build_wind_adjacency_matrix)
+    that are updated in place when a city is added or removed or a wind reading changes
+    - Only sources whose radius band contains the changed city get their angle
+      segments recomputed
+    - Adjacency assignments are replayed only for changed sources and for later
+      sources that list a target whose "has outgoing edge" state changed
+    - Every city whose edges or adjacency row/column changed is added to dirty,
+      so spectral stages know what to refresh
+    The result always equals a full rebuild over the current cities, in order
+    """
+
+    def __init__(self, coordinates, speeds=None, directions=None, radius_km=100, angle_segment_size=20,
+                 max_radius_km=400, wind_segment_size=20):
+        """
+        Parameters:
+            coordinates: dict of {city: (lat, lon)}, its order is the city order
+            speeds, directions: dicts of {city: value} (missing cities have no reading)
+            radius_km, max_radius_km, angle_segment_size: as in build_graph
+            wind_segment_size: angle_segment_size of build_wind_adjacency_matrix
+        """
+        self.cities = list(coordinates)
+        self.coordinates = dict(coordinates)
+        self.speeds = dict(speeds or {})
+        self.directions = dict(directions or {})
+        self.radius_km = radius_km
+        self.angle_segment_size = angle_segment_size
+        self.max_radius_km = max_radius_km
+        self.wind_segment_size = wind_segment_size
+
+        self.graph = {}
+        # target -> sources having an edge to it
+        self.referrers = defaultdict(set)
+        # source -> (target, weight) adjacency assignment
+        self.assignments = {}
+        # target -> sources assigning it a positive weight (its outgoing edge)
+        self.owners = defaultdict(set)
+        self.dirty = set()
+        self._reindex()
+        self._update_edges(self.cities)
+        self._replay(self.cities)
+        self.dirty = set()
+
+    @classmethod
+    def from_dataframe(cls, df, coordinates, **params):
+        """
+        Build from the wind DataFrame ('District', speed and direction columns)
+        """
+        cities = list(coordinates)
+        speeds, directions, has_wind = align_wind_to_cities(df, cities)
+        return cls(
+            coordinates,
+            {city: speeds[i] for i, city in enumerate(cities) if has_wind[i]},
+            {city: directions[i] for i, city in enumerate(cities) if has_wind[i]},
+            **params
+        )
+
+    def add_city(self, city, lat, lon, speed=None, direction=None):
+        """
+        Add a city (at the end of the city order) with an optional wind reading
+        """
+        if city in self.position:
+            raise ValueError(f"City already in graph: {city}")
+        self.cities.append(city)
+        self.coordinates[city] = (lat, lon)
+        if direction is not None:
+            self.speeds[city] = speed
+            self.directions[city] = direction
+        self._reindex()
+        affected = self._sources_in_band(lat, lon) + [city]
+        self.dirty.add(city)
+        self._update_edges(affected)
+        self._replay(affected)
+
+    def remove_city(self, city):
+        """
+        Remove a city, its edges and its adjacency row and column
+        """
+        position = self.position[city]
+        # Edges are listed in order of first appearance of their segment, so every
+        # source seeing the removed city inside its radius band is recomputed
+        affected = set(self._sources_in_band(*self.coordinates[city])) - {city}
+        self.referrers.pop(city, None)
+        old = self.assignments.pop(city, None)
+        changed_targets = []
+        if old is not None:
+            self.owners[old[0]].discard(city)
+            changed_targets.append(old[0])
+        # Sources that assigned wind to the removed city lose that edge
+        for owner in self.owners.pop(city, set()):
+            affected.add(owner)
+        for edge in self.graph.pop(city, []):
+            self.referrers[edge['city']].discard(city)
+        for source in list(self.assignments):
+            if self.assignments[source][0] == city:
+                del self.assignments[source]
+                affected.add(source)
+
+        self.cities.remove(city)
+        del self.coordinates[city]
+        self.speeds.pop(city, None)
+        self.directions.pop(city, None)
+        self.dirty.discard(city)
+        self.dirty.update(affected)
+        self._reindex()
+        self._update_edges(affected)
+        # Cities after the removed one now start at its old position
+        self._replay(affected, [(target, position) for target in changed_targets if target in self.position])
+
+    def update_wind(self, city, speed, direction):
+        """
+        Set (or correct) the wind reading of a city
+        """
+        self.speeds[city] = speed
+        self.directions[city] = direction
+        self._replay([city])
+
+    def pop_dirty(self):
+        """
+        Return the cities changed since the last call and reset the dirty set
+        """
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def adjacency_matrix(self, sparse=True):
+        """
+        Current wind adjacency matrix in city order, as build_wind_adjacency_matrix returns it
+        """
+        n = len(self.cities)
+        entries = [
+            (self.position[target], self.position[source], weight)
+            for source, (target, weight) in self.assignments.items()
+        ]
+        rows, cols, weights = zip(*entries) if entries else ((), (), ())
+        adj_matrix = sp.csr_matrix((np.array(weights, dtype=float), (rows, cols)), shape=(n, n))
+        adj_matrix.eliminate_zeros()
+        return (adj_matrix if sparse else adj_matrix.toarray()), list(self.cities)
+
+    def _reindex(self):
+        self.position = {city: i for i, city in enumerate(self.cities)}
+
+    def _coordinate_arrays(self):
+        lats = np.array([self.coordinates[city][0] for city in self.cities], dtype=float)
+        lons = np.array([self.coordinates[city][1] for city in self.cities], dtype=float)
+        return lats, lons
+
+    def _sources_in_band(self, lat, lon):
+        """
+        Cities whose radius band (radius_km, max_radius_km] contains the point
+        """
+        lats, lons = self._coordinate_arrays()
+        distances, _ = compute_pairwise_geometry(lat, lon, lats, lons)
+        in_band = (distances > self.radius_km) & (distances <= self.max_radius_km)
+        return [self.cities[i] for i in np.flatnonzero(in_band)]
+
+    def _update_edges(self, sources):
+        """
+        Recompute the angle segment edges of the given sources
+        """
+        sources = [city for city in dict.fromkeys(sources) if city in self.position]
+        if not sources:
+            return
+        lats, lons = self._coordinate_arrays()
+        source_indices = np.array([self.position[city] for city in sources])
+        rows, cols, distances, bearings, segments = select_source_edges(
+            source_indices, lats, lons, self.radius_km, self.angle_segment_size, self.max_radius_km
+        )
+        new_edges = defaultdict(list)
+        for row, col, distance, bearing, segment in zip(rows, cols, distances, bearings, segments):
+            new_edges[sources[row]].append({
+                'city': self.cities[col],
+                'distance': float(distance),
+                'bearing': float(bearing),
+                'segment': int(segment)
+            })
+        for city in sources:
+            old_edges = self.graph.pop(city, [])
+            for edge in old_edges:
+                self.referrers[edge['city']].discard(city)
+            if new_edges[city]:
+                self.graph[city] = new_edges[city]
+                for edge in new_edges[city]:
+                    self.referrers[edge['city']].add(city)
+            if old_edges != new_edges[city]:
+                self.dirty.add(city)
+
+    def _has_outgoing_before(self, target, position):
+        return any(self.position[owner] < position for owner in self.owners[target])
+
+    def _assign(self, source):
+        """
+        Adjacency assignment of one source given the assignments of earlier sources
+        """
+        direction = self.directions.get(source)
+        if source not in self.graph or direction is None or direction != direction:
+            return None
+        wind_segment = int(direction // self.wind_segment_size)
+        position = self.position[source]
+        candidates = [
+            edge for edge in self.graph[source]
+            if edge['segment'] == wind_segment and not self._has_outgoing_before(edge['city'], position)
+        ]
+        if not candidates:
+            return None
+        closest = min(candidates, key=lambda edge: edge['distance'])
+        # A missing speed is NaN, like in build_wind_adjacency_matrix
+        return (closest['city'], self.speeds.get(source, np.nan))
+
+    def _replay(self, sources, changed_targets=()):
+        """
+        Re-run the sequential adjacency assignment for the given sources and every
+        later source whose candidates' outgoing state changed as a consequence
+        """
+        heap = []
+        queued = set()
+
+        def push(city):
+            if city in self.position and city not in queued:
+                queued.add(city)
+                heapq.heappush(heap, (self.position[city], city))
+
+        def push_referrers(target, after):
+            for referrer in self.referrers.get(target, ()):
+                if self.position[referrer] >= after:
+                    push(referrer)
+
+        for city in sources:
+            push(city)
+        for target, after in changed_targets:
+            push_referrers(target, after)
+
+        while heap:
+            position, source = heapq.heappop(heap)
+            new = self._assign(source)
+            old = self.assignments.get(source)
+            if new == old:
+                continue
+            for assignment in (old, new):
+                if assignment is not None:
+                    self.owners[assignment[0]].discard(source)
+            if new is None:
+                del self.assignments[source]
+            else:
+                self.assignments[source] = new
+                if new[1] is not None and new[1] > 0:
+                    self.owners[new[0]].add(source)
+            self.dirty.add(source)
+            for assignment in (old, new):
+                if assignment is not None:
+                    self.dirty.add(assignment[0])
+                    push_referrers(assignment[0], position + 1)
@@ -0,0 +1,125 @@
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+import numpy as np
+import scipy.sparse as sp
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+PROFILE_DIR = PROJECT_ROOT / "output" / "profiles"
+logger = logging.getLogger(__name__)
+# Highest traced memory of every open stage, so nested stages do not hide the
+# peak of the stage around them when they reset the tracemalloc peak
+_open_stage_peaks = []
+
+@contextmanager
+def instrument_stage(stage, records=None, profile=False, trace_memory=True, profile_dir=PROFILE_DIR):
+    """
+    Measure a pipeline stage run inside the with block
+    Yields the stage record; assign record['result'] = describe_result(result) to
+    report the shapes/nnz of what the stage produced
+    Parameters:
+        stage: stage name
+        records: list the record is appended to (the run report)
+        profile: run the stage under cProfile and write <profile_dir>/<stage>.prof
+        trace_memory: measure the peak memory allocated by the stage with tracemalloc
+                      (slows down allocation-heavy Python code)
+        profile_dir: directory of the cProfile dumps
+    Record:
+        stage, wall_s, cpu_s, peak_mb (None without trace_memory), status
+        ('ok' or the exception), profile (path of the dump) and result
+    """
+    record = {'stage': stage}
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        if _open_stage_peaks:
+            _open_stage_peaks[-1] = max(_open_stage_peaks[-1], tracemalloc.get_traced_memory()[1])
+        start_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        _open_stage_peaks.append(start_memory)
+    profiler = cProfile.Profile() if profile else None
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield record
+        record['status'] = 'ok'
+    except Exception as e:
+        record['status'] = f"error: {e}"
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        record['wall_s'] = time.perf_counter() - wall_start
+        record['cpu_s'] = time.process_time() - cpu_start
+        record['peak_mb'] = None
+        if trace_memory:
+            peak = max(_open_stage_peaks.pop(), tracemalloc.get_traced_memory()[1])
+            record['peak_mb'] = (peak - start_memory) / 2**20
+            if _open_stage_peaks:
+                _open_stage_peaks[-1] = max(_open_stage_peaks[-1], peak)
+            if started_tracing:
+                tracemalloc.stop()
+        if profiler is not None:
+            Path(profile_dir).mkdir(parents=True, exist_ok=True)
+            profile_file = Path(profile_dir) / f"{stage}.prof"
+            profiler.dump_stats(profile_file)
+            record['profile'] = str(profile_file)
+            if logger.isEnabledFor(logging.DEBUG):
+                stream = io.StringIO()
+                pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(20)
+                logger.debug(f"Profile of stage '{stage}':\n{stream.getvalue()}")
+        if records is not None:
+            records.append(record)
+        peak_text = f", peak {record['peak_mb']:.1f} MB" if record['peak_mb'] is not None else ""
+        logger.info(f"Stage '{stage}' {record['status']}: wall {record['wall_s']:.3f} s, "
+                    f"cpu {record['cpu_s']:.3f} s{peak_text}")
+
+
+def instrumented(stage=None, records=None, **options):
+    """
+    Decorator form of instrument_stage, the stage name defaults to the function
+    name and the sizes of the return value are recorded
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with instrument_stage(stage or function.__name__, records, **options) as record:
+                result = function(*args, **kwargs)
+                record['result'] = describe_result(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def describe_result(result, depth=1):
+    """
+    JSON description of a stage result: shape, dtype and nnz of matrices, lengths
+    of containers, one level into tuples, lists and dicts
+    """
+    if sp.issparse(result):
+        return {'type': 'sparse', 'shape': list(result.shape), 'nnz': int(result.nnz), 'dtype': str(result.dtype)}
+    if isinstance(result, np.ndarray):
+        return {'type': 'array', 'shape': list(result.shape), 'nnz': int(np.count_nonzero(result)),
+                'dtype': str(result.dtype)}
+    if hasattr(result, 'W') and hasattr(result, 'N'):
+        # PyGSP graph
+        return {'type': 'graph', 'N': int(result.N), 'Ne': int(result.Ne), 'nnz': int(result.W.nnz)}
+    if isinstance(result, dict):
+        if depth == 0:
+            return {'type': 'dict', 'len': len(result)}
+        described = {str(key): describe_result(value, depth - 1) for key, value in result.items()}
+        # Only entries that carry sizes
+        return {key: value for key, value in described.items() if value is not None}
+    if isinstance(result, (list, tuple)):
+        if depth == 0 or not any(sp.issparse(item) or isinstance(item, np.ndarray) for item in result):
+            return {'type': type(result).__name__, 'len': len(result)}
+        return [describe_result(item, depth - 1) for item in result]
+    return None
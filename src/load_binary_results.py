@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+import numpy as np
+import scipy.sparse as sp
+
+def load_binary_results(output_dir, names=None, mmap_mode='r'):
+    """
+    Open results written by save_binary_results
+    Arrays are memory-mapped by default, so reading e.g. results['eigenvectors'][:, j]
+    only reads that column from disk
+    Parameters:
+        output_dir: directory written by save_binary_results
+        names: subset of entries to open (None opens all)
+        mmap_mode: numpy memory-map mode, None loads arrays into memory
+    Returns:
+        dict of {name: array, CSR matrix or value}
+    """
+    output_dir = Path(output_dir)
+    with open(output_dir / "manifest.json", 'r') as f:
+        manifest = json.load(f)
+    results = {name: value for name, value in manifest['values'].items() if names is None or name in names}
+    for name, entry in manifest['arrays'].items():
+        if names is None or name in names:
+            results[name] = np.load(output_dir / entry['file'], mmap_mode=mmap_mode)
+    for name, entry in manifest['sparse'].items():
+        if names is None or name in names:
+            data, indices, indptr = (
+                np.load(output_dir / entry['files'][part], mmap_mode=mmap_mode)
+                for part in ('data', 'indices', 'indptr')
+            )
+            results[name] = sp.csr_matrix((data, indices, indptr), shape=tuple(entry['shape']), copy=False)
+    return results
@@ -1,7 +1,9 @@
+import logging
 import json, os
 from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 CACHE_FILE = PROJECT_ROOT / "data" / "coordinates_cache.json"
+logger = logging.getLogger(__name__)
 
 def load_cached_coordinates(cache_file=CACHE_FILE):
     """
@@ -10,6 +12,6 @@ def load_cached_coordinates(cache_file=CACHE_FILE):
     if os.path.exists(cache_file):
         with open(cache_file, 'r') as f:
             cache = json.load(f)
-        print(f"Loaded coordinates from cache successfully")
+        logger.info(f"Loaded coordinates from cache successfully")
         return cache
     return {}
@@ -0,0 +1,76 @@
+import logging
+from collections import defaultdict
+from pathlib import Path
+import pandas as pd
+from .normalize_place_name import normalize_place_name
+logger = logging.getLogger(__name__)
+
+def load_gazetteer(gazetteer_file, name_column='name', state_column='state',
+                   lat_column='lat', lon_column='lon'):
+    """
+    Load a local gazetteer (CSV or Parquet of place name, state, lat, lon) into an in-memory index
+    Parameters:
+        gazetteer_file: .csv or .parquet file
+        name_column, state_column, lat_column, lon_column: column names in the file
+    Returns:
+        gazetteer: dict containing
+            - exact: {(name, state): (lat, lon)} on normalized names
+            - by_name: {name: (lat, lon)} first entry of every normalized name
+            - stripped: {(name, state): (lat, lon)} on names without suffix words,
+                        only where that name stands for a single place of the state
+            - stripped_by_name: {name: (lat, lon)} same, for names without suffix words
+                                standing for a single place of the whole gazetteer
+            - names_by_state: {state: [names]} candidates for fuzzy matching
+            - names: all normalized names
+            - ambiguous: names found in more than one state (e.g. Aurangabad, Bilaspur),
+                         only resolved within their state
+    """
+    gazetteer_file = Path(gazetteer_file)
+    columns = [name_column, state_column, lat_column, lon_column]
+    if gazetteer_file.suffix == '.parquet':
+        places = pd.read_parquet(gazetteer_file, columns=columns)
+    else:
+        places = pd.read_csv(gazetteer_file, usecols=columns)
+    places = places.dropna(subset=[name_column, lat_column, lon_column])
+
+    names = places[name_column].map(normalize_place_name)
+    short_names = places[name_column].map(lambda name: normalize_place_name(name, strip_suffixes=True))
+    states = places[state_column].map(lambda state: normalize_place_name(state, strip_suffixes=True))
+    exact = {}
+    by_name = {}
+    names_by_state = defaultdict(list)
+    states_by_name = defaultdict(set)
+    places_by_short_name = defaultdict(set)
+    for name, short_name, state, lat, lon in zip(names, short_names, states,
+                                                 places[lat_column], places[lon_column]):
+        if not name:
+            continue
+        coords = (float(lat), float(lon))
+        if (name, state) not in exact:
+            exact[(name, state)] = coords
+            names_by_state[state].append(name)
+        by_name.setdefault(name, coords)
+        states_by_name[name].add(state)
+        places_by_short_name[short_name].add((name, state))
+
+    # Without suffix words "Pune Dist." still finds "Pune", but "Bangalore Urban" and
+    # "Bangalore Rural" both become "bangalore", which then resolves to neither
+    stripped = {}
+    stripped_by_name = {}
+    for short_name, short_places in places_by_short_name.items():
+        if len(short_places) == 1:
+            stripped_by_name[short_name] = exact[next(iter(short_places))]
+        for name, state in short_places:
+            if sum(place_state == state for _, place_state in short_places) == 1:
+                stripped[(short_name, state)] = exact[(name, state)]
+
+    logger.info(f"Loaded gazetteer with {len(exact)} places from {gazetteer_file}")
+    return {
+        'exact': exact,
+        'by_name': by_name,
+        'stripped': stripped,
+        'stripped_by_name': stripped_by_name,
+        'names_by_state': dict(names_by_state),
+        'names': list(by_name),
+        'ambiguous': {name for name, name_states in states_by_name.items() if len(name_states) > 1}
+    }
@@ -0,0 +1,34 @@
+import logging
+import json, os
+from pathlib import Path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+GEOCODING_CACHE_FILE = PROJECT_ROOT / "data" / "coordinates_cache.jsonl"
+LEGACY_CACHE_FILE = PROJECT_ROOT / "data" / "coordinates_cache.json"
+logger = logging.getLogger(__name__)
+
+def load_geocoding_cache(cache_file=GEOCODING_CACHE_FILE, legacy_cache_file=LEGACY_CACHE_FILE):
+    """
+    Load the append-only geocoding cache (one JSON record per line)
+    Entries of the legacy {city: [lat, lon]} json cache are loaded too, with an unknown state
+    Returns a dictionary of {(district, state): (lat, lon)}
+    """
+    cache = {}
+    if legacy_cache_file is not None and os.path.exists(legacy_cache_file):
+        with open(legacy_cache_file, 'r') as f:
+            for city, (lat, lon) in json.load(f).items():
+                cache[(city, None)] = (lat, lon)
+    if os.path.exists(cache_file):
+        with open(cache_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partially written last line of an interrupted run
+                    continue
+                cache[(record['district'], record['state'])] = (record['lat'], record['lon'])
+    if cache:
+        logger.info(f"Loaded {len(cache)} coordinates from cache successfully")
+    return cache
@@ -0,0 +1,76 @@
+import logging
+import hashlib
+import json
+import os
+from pathlib import Path
+import pandas as pd
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_FILE = PROJECT_ROOT / "data" / "wind_data.xlsx"
+WIND_COLUMNS = ['State', 'District', 'Speed (in m/s)', 'Direction (in ° angle)']
+logger = logging.getLogger(__name__)
+
+def load_wind_data(data_file=DATA_FILE, sidecar_file=None, columns=WIND_COLUMNS):
+    """
+    Load the wind table through a typed Parquet sidecar of the Excel file
+    The Excel file is only parsed when the sidecar is missing or stale (source size,
+    mtime and, if those changed, SHA-256 are checked); the sidecar holds just the
+    needed columns with District/State stripped once and numeric speed/direction
+    Parameters:
+        data_file: source Excel file
+        sidecar_file: Parquet sidecar, defaults to data_file with a .parquet suffix
+        columns: columns to keep
+    Returns:
+        df: DataFrame with the requested columns
+    Raises FileNotFoundError if data_file does not exist
+    """
+    data_file = Path(data_file)
+    sidecar_file = data_file.with_suffix('.parquet') if sidecar_file is None else Path(sidecar_file)
+    stamp_file = sidecar_file.with_name(sidecar_file.name + '.json')
+    source_stat = os.stat(data_file)
+    stamp = {'size': source_stat.st_size, 'mtime_ns': source_stat.st_mtime_ns, 'columns': list(columns)}
+
+    if sidecar_file.exists() and stamp_file.exists():
+        with open(stamp_file, 'r') as f:
+            saved = json.load(f)
+        fresh = all(saved.get(key) == value for key, value in stamp.items())
+        if not fresh and saved.get('columns') == list(columns):
+            # Touched but possibly unchanged: compare content
+            stamp['sha256'] = _file_sha256(data_file)
+            fresh = saved.get('sha256') == stamp['sha256']
+            if fresh:
+                _write_stamp(stamp_file, {**saved, **stamp})
+        if fresh:
+            try:
+                return pd.read_parquet(sidecar_file, columns=list(columns))
+            except ImportError:
+                pass
+
+    df = pd.read_excel(data_file, usecols=lambda column: column in columns)
+    # Normalize names once here instead of on every lookup
+    for column in ('District', 'State'):
+        if column in df.columns:
+            df[column] = df[column].astype('string').str.strip()
+    for column in ('Speed (in m/s)', 'Direction (in ° angle)'):
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(float)
+
+    try:
+        df.to_parquet(sidecar_file, index=False)
+        stamp['sha256'] = stamp.get('sha256') or _file_sha256(data_file)
+        _write_stamp(stamp_file, stamp)
+    except ImportError:
+        logger.warning("pyarrow not installed, wind data sidecar not written")
+    return df
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_stamp(stamp_file, stamp):
+    with open(stamp_file, 'w') as f:
+        json.dump(stamp, f, indent=2)
@@ -1,47 +1,135 @@
-import pandas as pd
+if __name__ == "__main__" and not __package__:
+    # python src/main.py: the relative imports below need the package, run its CLI instead
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from src.__main__ import cli
+    sys.exit(cli(['run', *sys.argv[1:]]))
+import logging
 import numpy as np
-from pygsp import graphs
-from visualize_pygsp_graph import visualize_pygsp_graph
-from save_pygsp_graph import save_pygsp_graph
-from build_pygsp_graph import build_pygsp_graph
-from compute_hermitian_random_walk_laplacian import compute_hermitian_random_walk_laplacian
-from build_wind_adjacency_matrix import build_wind_adjacency_matrix
-from build_graph import build_graph
-from fetch_all_coordinates import fetch_all_coordinates
+from .compute_hermitian_random_walk_laplacian import compute_hermitian_random_walk_laplacian
+from .build_wind_adjacency_matrix import build_wind_adjacency_matrix
+from .save_adjacency_matrix import save_adjacency_matrix
+from .build_graph import build_graph
+from .fetch_all_coordinates import fetch_all_coordinates
+from .load_wind_data import load_wind_data
+from .run_cached_stage import run_cached_stage
+from .encode_graph import encode_graph, decode_graph
+from .instrument_stage import instrument_stage, describe_result
+from .write_run_report import write_run_report, RUN_REPORT_FILE
 from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+logger = logging.getLogger(__name__)
+
+def main(profile_stage=None, report_file=RUN_REPORT_FILE, trace_memory=True, headless=False):
+    """
+    Run the pipeline, every stage is timed and measured (see instrument_stage)
+    Parameters:
+        headless: compute-only run, skips the PyGSP graph, the plot and the graph
+                  export so neither PyGSP nor matplotlib is imported
+        profile_stage: name of a stage to run under cProfile (e.g. 'hermitian')
+        report_file: JSON run report with one record per stage
+        trace_memory: measure the peak allocated memory of each stage
+    """
+    records = []
+
+    def stage(name):
+        return instrument_stage(name, records, profile=(name == profile_stage), trace_memory=trace_memory)
 
-def main():
     try:
         DATA_FILE = PROJECT_ROOT / "data" / "wind_data.xlsx"
-        df = pd.read_excel(DATA_FILE)
+        with stage('load_wind_data') as record:
+            df = load_wind_data(DATA_FILE)
+            record['result'] = {'rows': len(df)}
     except FileNotFoundError:
-        print("ERROR during reading the Excel file!!")
+        logger.error("ERROR during reading the Excel file!!")
+        write_run_report(records, report_file)
         return None, None
-    
-    coordinates, dataf = fetch_all_coordinates(df, use_cache=True)
-    graph = build_graph(dataf, coordinates, radius_km=100, angle_segment_size=20)
+
+    with stage('geocode') as record:
+        coordinates, dataf = fetch_all_coordinates(df, use_cache=True)
+        record['result'] = {'cities': len(coordinates)}
+    # Stages are cached under output/stage_cache and only recomputed when their inputs change
+    graph_params = {'radius_km': 100, 'angle_segment_size': 20}
+    with stage('graph') as record:
+        graph, graph_key = run_cached_stage(
+            'graph', lambda: build_graph(dataf, coordinates, **graph_params),
+            inputs=[dataf['District'], coordinates], params=graph_params,
+            encode=encode_graph, decode=decode_graph
+        )
+        record['result'] = {'nodes': len(graph), 'edges': sum(len(edges) for edges in graph.values())}
 
     # Build Adjancency matrix
-    adj_matrix, city_order = build_wind_adjacency_matrix(
-        dataf, graph, coordinates, angle_segment_size=20
-    )
-    print(f"\nMatrix size: {adj_matrix.shape}")
+    adjacency_params = {'angle_segment_size': 20, 'sparse': True}
+    wind_columns = ['District', 'Speed (in m/s)', 'Direction (in ° angle)']
+    with stage('adjacency') as record:
+        (adj_matrix, city_order), adjacency_key = run_cached_stage(
+            'adjacency', lambda: build_wind_adjacency_matrix(dataf, graph, coordinates, **adjacency_params),
+            inputs=[graph_key, dataf[wind_columns], list(coordinates)], params=adjacency_params,
+            encode=lambda result: {'adj_matrix': result[0], 'cities': np.array(result[1], dtype=str)},
+            decode=lambda arrays: (arrays['adj_matrix'], [str(city) for city in arrays['cities']])
+        )
+        record['result'] = describe_result(adj_matrix)
+    logger.info(f"Matrix size: {adj_matrix.shape}")
 
-    # Save adjacency matrix to csv file
-    adj_df = pd.DataFrame(adj_matrix, index=city_order, columns=city_order)
-    adj_df.to_csv('wind_adjacency_matrix.csv')
+    # Save adjacency matrix to csv file (edge list, one row per nonzero)
+    with stage('save_adjacency'):
+        save_adjacency_matrix(adj_matrix, city_order, 'wind_adjacency_edges.csv')
 
     # Computing eigen values and eigen vectors using hermitian method for directed graph
-    results_from_hermitian_method = compute_hermitian_random_walk_laplacian(adj_matrix, 0.01, False)
-    # print("results_from_hermitian_method: \n")
-    # print(results_from_hermitian_method, "\n")
-    # BUILD PYGSP GRAPH
-    pygsp_graph = build_pygsp_graph(adj_matrix, city_order, coordinates)
-    if pygsp_graph is not None:
-        visualize_pygsp_graph(pygsp_graph, city_order)
-        save_pygsp_graph(pygsp_graph, city_order)
+    # π of the wind transition matrix itself, dangling nodes are not redistributed
+    hermitian_params = {'q': 0.01, 'redistribute_dangling': False}
+    with stage('hermitian') as record:
+        results_from_hermitian_method, _ = run_cached_stage(
+            'hermitian', lambda: compute_hermitian_random_walk_laplacian(adj_matrix, verbose=False, **hermitian_params),
+            inputs=[adjacency_key], params=hermitian_params
+        )
+        record['result'] = describe_result({
+            name: results_from_hermitian_method[name] for name in ('L_hrw', 'eigenvalues', 'eigenvectors')
+            if name in results_from_hermitian_method
+        })
+    if not headless:
+        _run_pygsp_stages(stage, adj_matrix, city_order, coordinates, adjacency_key)
+
+    report = write_run_report(records, report_file, metadata={'data_file': str(DATA_FILE), **hermitian_params})
+    logger.info(f"Run report written to {report_file} (total {report['total_wall_s']:.2f} s)")
     return graph, coordinates
 
+
+def _run_pygsp_stages(stage, adj_matrix, city_order, coordinates, adjacency_key):
+    """
+    PyGSP graph with its SVD basis, plot and graph export (PyGSP and matplotlib
+    are only imported here)
+    """
+    try:
+        import pygsp  # noqa: F401
+    except ImportError:
+        # Checked before the stage, so no empty SVD is cached for later runs with PyGSP
+        logger.error("PyGSP not installed, skipping the PyGSP graph, plot and export")
+        return
+    from .build_pygsp_graph import build_pygsp_graph
+    from .visualize_pygsp_graph import visualize_pygsp_graph
+    from .save_pygsp_graph import save_pygsp_graph
+    pygsp_graph = None
+    def compute_pygsp_svd():
+        nonlocal pygsp_graph
+        pygsp_graph = build_pygsp_graph(adj_matrix, city_order, coordinates)
+        return pygsp_graph.svd
+    with stage('pygsp_svd') as record:
+        svd, _ = run_cached_stage('pygsp_svd', compute_pygsp_svd, inputs=[adjacency_key],
+                                  params={'svd_method': 'full', 'svd_rank': None})
+        if pygsp_graph is None:
+            # SVD came from the cache, the graph itself is cheap to rebuild
+            pygsp_graph = build_pygsp_graph(adj_matrix, city_order, coordinates, svd=svd)
+        record['result'] = describe_result(svd)
+    if pygsp_graph is not None:
+        with stage('visualize'):
+            visualize_pygsp_graph(pygsp_graph, city_order)
+        with stage('save_pygsp_graph'):
+            save_pygsp_graph(pygsp_graph, city_order)
+
 if __name__ == "__main__":
-    graph, coordinates = main()
+    # python -m src.main behaves like python -m src run
+    import sys
+    from .__main__ import cli
+    sys.exit(cli(['run', *sys.argv[1:]]))
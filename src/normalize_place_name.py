@@ -0,0 +1,19 @@
+import re
+import unicodedata
+
+# Administrative words that gazetteers and the wind table use inconsistently
+PLACE_SUFFIXES = {'district', 'dist', 'city', 'urban', 'rural', 'division', 'state', 'ut'}
+
+def normalize_place_name(name, strip_suffixes=False):
+    """
+    Normalize a place name for matching: ASCII, lowercase, no punctuation and single spaces
+    strip_suffixes also drops the administrative suffix words (e.g. "Dist."), which
+    can merge different places ("Bangalore Urban" and "Bangalore Rural")
+    Returns '' for missing names
+    """
+    if name is None or name != name:
+        return ''
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    name = re.sub(r'[^a-z0-9]+', ' ', name.lower())
+    words = [word for word in name.split() if not (strip_suffixes and word in PLACE_SUFFIXES)]
+    return ' '.join(words)
@@ -0,0 +1,181 @@
+import logging
+import functools
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+STAGE_CACHE_DIR = PROJECT_ROOT / "output" / "stage_cache"
+# Bumped when the artifact layout written by _save_artifact changes
+CACHE_FORMAT_VERSION = 2
+logger = logging.getLogger(__name__)
+
+def run_cached_stage(stage, compute, inputs, params=None, encode=None, decode=None,
+                     cache_dir=STAGE_CACHE_DIR, max_cache_bytes=2 * 1024**3, use_cache=True):
+    """
+    Run a pipeline stage through a content-addressed artifact cache
+    The cache key is a hash of the stage name, its inputs and its parameters, salted
+    with the artifact format version and the package sources, so a stage is only
+    recomputed when one of them or the code changed
+    Parameters:
+        stage: stage name, e.g. 'graph'
+        compute: function without arguments that computes the stage result
+        inputs: list of stage inputs to hash (arrays, sparse matrices, DataFrames,
+                dicts, lists, scalars, file paths or keys of upstream stages)
+        params: dict of stage parameters
+        encode: turns the result into a dict of arrays / sparse matrices / json values
+        decode: inverse of encode
+        cache_dir: cache directory, one sub-directory per artifact
+        max_cache_bytes: least recently used artifacts are evicted above this size
+        use_cache: False always recomputes (and refreshes the artifact)
+    Returns:
+        result: stage result
+        key: cache key, usable as input of downstream stages
+    """
+    key = f"{stage}-{_hash_inputs(stage, inputs, params or {})}"
+    artifact_dir = Path(cache_dir) / key
+    if use_cache and (artifact_dir / "manifest.json").exists():
+        try:
+            arrays = _load_artifact(artifact_dir)
+            os.utime(artifact_dir / "manifest.json")
+            logger.info(f"Stage '{stage}' loaded from cache ({key})")
+            return (decode(arrays) if decode else arrays), key
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Stage '{stage}' cache unreadable, recomputing: {e}")
+
+    result = compute()
+    _save_artifact(artifact_dir, encode(result) if encode else result)
+    evict_stage_cache(cache_dir, max_cache_bytes)
+    return result, key
+
+
+def evict_stage_cache(cache_dir=STAGE_CACHE_DIR, max_cache_bytes=2 * 1024**3):
+    """
+    Delete least recently used artifacts until the cache is below max_cache_bytes
+    """
+    cache_dir = Path(cache_dir)
+    if not cache_dir.exists():
+        return
+    artifacts = []
+    for artifact_dir in cache_dir.iterdir():
+        manifest = artifact_dir / "manifest.json"
+        if not manifest.exists():
+            continue
+        size = sum(f.stat().st_size for f in artifact_dir.iterdir())
+        artifacts.append((manifest.stat().st_mtime, size, artifact_dir))
+    total = sum(size for _, size, _ in artifacts)
+    for _, size, artifact_dir in sorted(artifacts, key=lambda a: a[0]):
+        if total <= max_cache_bytes:
+            break
+        shutil.rmtree(artifact_dir, ignore_errors=True)
+        total -= size
+        logger.debug(f"Evicted stage artifact {artifact_dir.name}")
+
+
+def _hash_inputs(stage, inputs, params):
+    """
+    Stable hash of a stage's inputs and parameters
+    """
+    digest = hashlib.sha256()
+    digest.update(f"format{CACHE_FORMAT_VERSION}".encode())
+    digest.update(_code_version().encode())
+    digest.update(stage.encode())
+    _update_hash(digest, params)
+    for value in inputs:
+        _update_hash(digest, value)
+    return digest.hexdigest()[:20]
+
+
+@functools.lru_cache(maxsize=None)
+def _code_version():
+    """
+    Hash of the package sources, artifacts of older code are never reused
+    """
+    digest = hashlib.sha256()
+    for source in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def _update_hash(digest, value):
+    if isinstance(value, np.ndarray):
+        digest.update(f"ndarray{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif sp.issparse(value):
+        value = sp.csr_matrix(value)
+        value.sort_indices()
+        digest.update(f"sparse{value.dtype}{value.shape}".encode())
+        for part in (value.data, value.indices, value.indptr):
+            digest.update(np.ascontiguousarray(part).tobytes())
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, dict):
+        digest.update(b"dict")
+        for k in sorted(value, key=repr):
+            _update_hash(digest, k)
+            _update_hash(digest, value[k])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"seq{len(value)}".encode())
+        for item in value:
+            _update_hash(digest, item)
+    elif isinstance(value, Path):
+        # Files are addressed by content, not by name or mtime
+        with open(value, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    else:
+        digest.update(repr(value).encode())
+
+
+def _save_artifact(artifact_dir, values):
+    """
+    Write a dict of values: dense arrays to one compressed npz, sparse matrices
+    to their own npz files and everything else to manifest.json
+    """
+    tmp_dir = artifact_dir.with_name(artifact_dir.name + f".tmp{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    arrays, manifest = {}, {'created': time.time(), 'arrays': [], 'sparse': [], 'values': {}}
+    for name, value in values.items():
+        if sp.issparse(value):
+            sp.save_npz(tmp_dir / f"{name}.sparse.npz", sp.csr_matrix(value), compressed=True)
+            manifest['sparse'].append(name)
+        elif isinstance(value, np.ndarray):
+            arrays[name] = value
+            manifest['arrays'].append(name)
+        else:
+            manifest['values'][name] = _to_json_value(value)
+    np.savez_compressed(tmp_dir / "arrays.npz", **arrays)
+    with open(tmp_dir / "manifest.json", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    shutil.rmtree(artifact_dir, ignore_errors=True)
+    os.replace(tmp_dir, artifact_dir)
+
+
+def _load_artifact(artifact_dir):
+    with open(artifact_dir / "manifest.json", 'r') as f:
+        manifest = json.load(f)
+    values = dict(manifest['values'])
+    with np.load(artifact_dir / "arrays.npz", allow_pickle=False) as arrays:
+        for name in manifest['arrays']:
+            values[name] = arrays[name]
+    for name in manifest['sparse']:
+        values[name] = sp.load_npz(artifact_dir / f"{name}.sparse.npz")
+    return values
+
+
+def _to_json_value(value):
+    if isinstance(value, dict):
+        return {k: _to_json_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from .save_blocked_matrix import vectors_per_block, MEMORY_BUDGET
+
+def save_adjacency_matrix(adj_matrix, cities, filename='wind_adjacency_matrix.csv', memory_budget=MEMORY_BUDGET):
+    """
+    Save the wind adjacency matrix to a csv file
+    Parameters:
+        adj_matrix: NxN numpy array (possibly memory-mapped) or scipy sparse matrix
+        cities: list of city names in matrix order
+        filename: output filename
+        memory_budget: bytes of matrix rows (or edges) formatted at once
+    A dense matrix is written as an NxN table labelled with city names,
+    a sparse matrix as an edge list (from, to, weight) with one row per nonzero.
+    Both are streamed to the file block by block instead of being formatted whole
+    """
+    names = np.asarray(cities, dtype=object)
+    with open(filename, 'w', newline='') as f:
+        if sp.issparse(adj_matrix):
+            coo = adj_matrix.tocoo()
+            # An edge row holds two indices and a weight
+            step = vectors_per_block(3, np.float64, memory_budget)
+            pd.DataFrame(columns=['from', 'to', 'weight']).to_csv(f, index=False)
+            for start in range(0, coo.nnz, step):
+                block = slice(start, start + step)
+                pd.DataFrame({
+                    'from': names[coo.row[block]],
+                    'to': names[coo.col[block]],
+                    'weight': coo.data[block]
+                }).to_csv(f, index=False, header=False)
+        else:
+            step = vectors_per_block(adj_matrix.shape[1], adj_matrix.dtype, memory_budget)
+            pd.DataFrame(columns=names).to_csv(f)
+            for start in range(0, adj_matrix.shape[0], step):
+                block = slice(start, start + step)
+                pd.DataFrame(np.asarray(adj_matrix[block]), index=names[block]).to_csv(f, header=False)
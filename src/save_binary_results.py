@@ -0,0 +1,50 @@
+import json
+import os
+from pathlib import Path
+import numpy as np
+import scipy.sparse as sp
+from .save_blocked_matrix import save_blocked_matrix, MEMORY_BUDGET
+
+def save_binary_results(results, output_dir, metadata=None, memory_budget=MEMORY_BUDGET):
+    """
+    Save results in a binary, memory-mappable layout:
+    - dense arrays as <name>.npy (2D arrays column-major, so one column, e.g. an
+      eigenvector, is contiguous on disk, written in column blocks by save_blocked_matrix)
+    - sparse matrices as CSR components <name>.data.npy, <name>.indices.npy, <name>.indptr.npy
+    - a small manifest.json with shapes, dtypes and the remaining scalar metadata
+    Parameters:
+        results: dict of {name: array, sparse matrix or json-able value}
+        output_dir: directory to write
+        metadata: extra json-able values stored in the manifest
+        memory_budget: bytes per column block written for a 2D array
+    An array memory-mapped from output_dir/<name>.npy (e.g. written beforehand by
+    save_blocked_matrix) is only recorded in the manifest
+    Returns:
+        path of the manifest
+    """
+    output_dir = Path(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {'arrays': {}, 'sparse': {}, 'values': dict(metadata or {})}
+    for name, value in results.items():
+        if sp.issparse(value):
+            value = sp.csr_matrix(value)
+            files = {}
+            for part in ('data', 'indices', 'indptr'):
+                files[part] = f"{name}.{part}.npy"
+                np.save(output_dir / files[part], getattr(value, part))
+            manifest['sparse'][name] = {'shape': list(value.shape), 'dtype': str(value.dtype), 'files': files}
+        elif isinstance(value, np.ndarray):
+            array_file = output_dir / f"{name}.npy"
+            in_place = (isinstance(value, np.memmap) and value.filename is not None
+                        and Path(value.filename).resolve() == array_file.resolve())
+            if not in_place and value.ndim == 2:
+                save_blocked_matrix(value, array_file, memory_budget)
+            elif not in_place:
+                np.save(array_file, value)
+            manifest['arrays'][name] = {'file': f"{name}.npy", 'shape': list(value.shape), 'dtype': str(value.dtype)}
+        else:
+            manifest['values'][name] = value.item() if isinstance(value, np.generic) else value
+    manifest_file = output_dir / "manifest.json"
+    with open(manifest_file, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_file
@@ -0,0 +1,46 @@
+import os
+from pathlib import Path
+import numpy as np
+import scipy.sparse as sp
+# Default working memory of the blockwise (out-of-core) writers and transforms, in bytes
+MEMORY_BUDGET = 256 * 2**20
+
+def save_blocked_matrix(matrix, output_file, memory_budget=MEMORY_BUDGET, columns=None):
+    """
+    Write a 2D matrix to a column-major .npy file, one block of columns at a time
+    The file is written through a memory map, so at most memory_budget bytes of
+    the matrix are materialized at once (a sparse matrix is densified block by
+    block) and one column, e.g. an eigenvector, is contiguous on disk
+    Parameters:
+        matrix: 2D numpy array, memory-mapped array or scipy sparse matrix
+        output_file: .npy file to write
+        memory_budget: bytes per written block of columns
+        columns: column order of the written matrix, e.g. the argsort of the
+                 eigenvalues (None keeps the order of matrix)
+    Returns:
+        path of the written file, open it with np.load(output_file, mmap_mode='r')
+    """
+    output_file = Path(output_file)
+    os.makedirs(output_file.parent, exist_ok=True)
+    if sp.issparse(matrix):
+        # Column slices of a CSC matrix only touch the nonzeros of those columns
+        matrix = sp.csc_matrix(matrix)
+    n_rows = matrix.shape[0]
+    columns = np.arange(matrix.shape[1]) if columns is None else np.asarray(columns)
+    stored = np.lib.format.open_memmap(output_file, mode='w+', dtype=matrix.dtype,
+                                       shape=(n_rows, len(columns)), fortran_order=True)
+    step = vectors_per_block(n_rows, matrix.dtype, memory_budget)
+    for start in range(0, len(columns), step):
+        block = matrix[:, columns[start:start + step]]
+        stored[:, start:start + step] = block.toarray() if sp.issparse(block) else block
+    stored.flush()
+    del stored
+    return output_file
+
+
+def vectors_per_block(length, dtype, memory_budget=MEMORY_BUDGET):
+    """
+    Number of vectors (rows or columns) of the given length and dtype that fit in
+    memory_budget bytes, at least one
+    """
+    return max(1, int(memory_budget // (length * np.dtype(dtype).itemsize)))
@@ -1,7 +1,9 @@
+import logging
 import json
 from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 CACHE_FILE = PROJECT_ROOT / "data" / "coordinates_cache.json"
+logger = logging.getLogger(__name__)
 
 def save_coordinates_cache(coordinates, cache_file=CACHE_FILE):
     """
@@ -9,4 +11,4 @@ def save_coordinates_cache(coordinates, cache_file=CACHE_FILE):
     """
     with open(cache_file, 'w') as f:
         json.dump(coordinates, f, indent=2)
-    print(f"Saved {len(coordinates)} coordinates to cache: {cache_file}")
+    logger.info(f"Saved {len(coordinates)} coordinates to cache: {cache_file}")
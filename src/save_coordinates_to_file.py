@@ -1,7 +1,9 @@
+import logging
 import pandas as pd
 from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 city_coordinates = PROJECT_ROOT / 'data' / 'city_coordinates.csv'
+logger = logging.getLogger(__name__)
 
 def save_coordinates_to_file(coordinates, filename=city_coordinates):
     """
@@ -12,4 +14,4 @@ def save_coordinates_to_file(coordinates, filename=city_coordinates):
         for city, (lat, lon) in coordinates.items()
     ])
     coords_df.to_csv(filename, index=False)
-    print(f"Coordinates saved to '{filename}'")
+    logger.info(f"Coordinates saved to '{filename}'")
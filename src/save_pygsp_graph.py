@@ -1,23 +1,39 @@
+import logging
+import numpy as np
 from pathlib import Path
+from .save_binary_results import save_binary_results
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
-PYGSP_OUTPUT_GRAPH_PKL = PROJECT_ROOT / 'output' / 'pygsp_graph.pkl'
+PYGSP_OUTPUT_DIR = PROJECT_ROOT / 'output' / 'pygsp_graph'
+logger = logging.getLogger(__name__)
 
-def save_pygsp_graph(G, cities, filename=PYGSP_OUTPUT_GRAPH_PKL):
+def save_pygsp_graph(G, cities, output_dir=PYGSP_OUTPUT_DIR):
     """
-    Save PyGSP graph to file using pickle
+    Save PyGSP graph in a binary, memory-mappable layout (see save_binary_results)
+    The sparse adjacency W and Laplacian L are stored as CSR components, node
+    coordinates and the SVD basis/GFT from build_pygsp_graph as .npy files, and the
+    city names and graph properties in the json manifest
     Parameters:
         G: PyGSP Graph object
         cities: list of city names
-        filename: output filename
+        output_dir: output directory
     """
     try:
-        import pickle
         graph_data = {
-            'graph': G,
-            'cities': cities,
-            'adjacency_matrix': G.W.toarray()
+            'W': G.W,
+            'coords': np.asarray(G.coords)
         }
-        with open(filename, 'wb') as f:
-            pickle.dump(graph_data, f)
+        if getattr(G, 'L', None) is not None:
+            graph_data['L'] = G.L
+        svd = getattr(G, 'svd', None) or {}
+        for name in ('U', 'sigma', 'V', 'gft'):
+            if name in svd:
+                graph_data[f"svd_{name}"] = svd[name]
+        save_binary_results(graph_data, output_dir, metadata={
+            'cities': list(cities),
+            'N': int(G.N),
+            'Ne': int(G.Ne),
+            'is_directed': bool(G.is_directed()),
+            'lap_type': getattr(G, 'lap_type', None)
+        })
     except Exception as e:
-        print(f"\n✗ Error saving graph: {e}")
+        logger.error(f"✗ Error saving graph: {e}")
@@ -0,0 +1,39 @@
+import numpy as np
+
+def select_segment_neighbours(rows, cols, distances, segments, n_rows, n_segments):
+    """
+    Select the closest candidate of every (source, angle segment) bucket with array reductions
+    Parameters:
+        rows: source index of each candidate (0..n_rows-1)
+        cols: target index of each candidate
+        distances: distance of each candidate
+        segments: angle segment of each candidate (0..n_segments-1)
+        n_rows: number of source cities in the block
+        n_segments: number of angle segments
+    Candidates must be ordered by row and then by target order (as np.nonzero returns them),
+    ties on distance are then resolved in favour of the earlier target like a stable sort
+    Returns:
+        indices into the candidate arrays of the selected candidates, ordered by source
+        and then by the first appearance of their segment among that source's candidates
+    """
+    n_candidates = len(rows)
+    keys = np.asarray(rows, dtype=np.int64) * n_segments + segments
+    n_keys = n_rows * n_segments
+    positions = np.arange(n_candidates)
+
+    # Closest distance per bucket
+    best = np.full(n_keys, np.inf)
+    np.minimum.at(best, keys, distances)
+
+    # First candidate reaching that distance
+    is_best = distances == best[keys]
+    winner = np.full(n_keys, n_candidates)
+    np.minimum.at(winner, keys[is_best], positions[is_best])
+
+    # First time each bucket shows up, to keep the segment order of the scalar loop
+    first_seen = np.full(n_keys, n_candidates)
+    np.minimum.at(first_seen, keys, positions)
+
+    used = winner < n_candidates
+    order = np.argsort(first_seen[used], kind='stable')
+    return winner[used][order]
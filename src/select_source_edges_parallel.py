@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from .build_spatial_index import build_spatial_index
+# Per-worker state set by _init_worker: the attached shared memory block, the
+# coordinate arrays viewing it and the worker's KD-tree
+_worker_state = {}
+
+def select_source_edges_parallel(lats, lons, radius_km, angle_segment_size, max_radius_km=400,
+                                 use_spatial_index=True, chunk_size=256, n_jobs=None):
+    """
+    select_source_edges over every city, with blocks of chunk_size source cities
+    sharded across a process pool
+    Coordinates are placed once in shared memory instead of being pickled for
+    every block, each worker builds its KD-tree once
+    Parameters:
+        lats, lons: coordinates of all cities
+        radius_km, max_radius_km, angle_segment_size, use_spatial_index: as in build_graph
+        chunk_size: number of source cities per task
+        n_jobs: number of worker processes, None uses os.cpu_count()
+    Returns:
+        list of (sources, (rows, cols, distances, bearings, segments)) per block,
+        in source order
+    """
+    n = len(lats)
+    shm = shared_memory.SharedMemory(create=True, size=max(2 * n * np.dtype(float).itemsize, 1))
+    try:
+        coordinates = np.ndarray((2, n), dtype=float, buffer=shm.buf)
+        coordinates[0] = lats
+        coordinates[1] = lons
+        starts = range(0, n, chunk_size)
+        tasks = [
+            (start, min(start + chunk_size, n), radius_km, angle_segment_size, max_radius_km)
+            for start in starts
+        ]
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(shm.name, n, use_spatial_index)) as pool:
+            blocks = [
+                (np.arange(task[0], task[1]), edges)
+                for task, edges in zip(tasks, pool.map(_select_block, tasks))
+            ]
+        del coordinates
+    finally:
+        shm.close()
+        shm.unlink()
+    return blocks
+
+
+def _init_worker(shm_name, n, use_spatial_index):
+    """
+    Attach the shared coordinates and build the worker's KD-tree
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    coordinates = np.ndarray((2, n), dtype=float, buffer=shm.buf)
+    _worker_state['shm'] = shm
+    _worker_state['lats'], _worker_state['lons'] = coordinates
+    _worker_state['tree'] = build_spatial_index(*coordinates) if use_spatial_index and n > 0 else None
+
+
+def _select_block(task):
+    # Imported here: build_graph imports this module
+    from .build_graph import select_source_edges
+    start, stop, radius_km, angle_segment_size, max_radius_km = task
+    return select_source_edges(
+        np.arange(start, stop), _worker_state['lats'], _worker_state['lons'],
+        radius_km, angle_segment_size, max_radius_km, _worker_state['tree']
+    )
@@ -0,0 +1,90 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .compute_hermitian_random_walk_laplacian import compute_hermitian_random_walk_laplacian
+# Per-worker state set by _init_worker: W, the shared π and the spectrum options
+_worker_state = {}
+# Entries of compute_hermitian_random_walk_laplacian's results that depend on q
+Q_RESULTS = ('L_hrw', 'eigenvalues', 'eigenvectors', 'is_hermitian', 'GFT', 'IGFT', 'spectrum_info')
+logger = logging.getLogger(__name__)
+
+def sweep_hermitian_q(W, qs, k=None, which='SA', sigma=None, n_jobs=1,
+                      stationary_method='power', teleport=0.0, pi0=None, verbose=True, dtype=np.float64,
+                      eigsh_tol=0.0, eigsh_ncv=None, eigsh_max_iter=None, redistribute_dangling=False):
+    """
+    compute_hermitian_random_walk_laplacian for several values of the phase parameter q
+    π is solved once, with the first q, and passed to every other q, which are
+    fanned out across a process pool
+    Parameters:
+    -----------
+    W : numpy.ndarray or scipy.sparse matrix
+        Weighted adjacency matrix (N x N)
+    qs : iterable of float
+        Phase parameters to sweep (at least one)
+    k, which, sigma, eigsh_tol, eigsh_ncv, eigsh_max_iter : 
+        Spectrum options of compute_hermitian_random_walk_laplacian
+    n_jobs : int or None
+        Number of worker processes, None uses os.cpu_count(), 1 runs in this process
+    stationary_method, teleport, pi0, redistribute_dangling :
+        Passed to compute_stationary_distribution
+    verbose : bool
+        Log the progress of the sweep
+    dtype : numpy dtype
+        Real working precision, as in compute_hermitian_random_walk_laplacian
+
+    Returns:
+    --------
+    dict containing:
+        - P, Pi, stationary_distribution, stationary_info, P_tilde: shared by every q
+        - spectra: dict of {q: dict with L_hrw, eigenvalues, eigenvectors,
+          is_hermitian, GFT, IGFT and spectrum_info}
+    """
+    qs = list(qs)
+    if not qs:
+        raise ValueError("qs is empty")
+    spectrum_options = {'k': k, 'which': which, 'sigma': sigma, 'eigsh_tol': eigsh_tol,
+                        'eigsh_ncv': eigsh_ncv, 'eigsh_max_iter': eigsh_max_iter, 'dtype': dtype}
+    first = compute_hermitian_random_walk_laplacian(
+        W, qs[0], verbose=False, stationary_method=stationary_method, teleport=teleport, pi0=pi0,
+        redistribute_dangling=redistribute_dangling, output_dir=None, **spectrum_options
+    )
+    stationary = (first['stationary_distribution'], first['stationary_info'])
+    if verbose:
+        logger.info(f"Stationary distribution: {first['stationary_info']}")
+        logger.info(f"Sweeping {len(qs)} values of q")
+
+    initargs = (W, stationary, spectrum_options)
+    if n_jobs == 1:
+        _init_worker(*initargs)
+        spectra = [_compute_q_spectrum(q) for q in qs[1:]]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=initargs) as pool:
+            spectra = list(pool.map(_compute_q_spectrum, qs[1:]))
+    _worker_state.clear()
+
+    return {
+        'P': first['P'],
+        'Pi': first['Pi'],
+        'stationary_distribution': first['stationary_distribution'],
+        'stationary_info': first['stationary_info'],
+        'P_tilde': first['P_tilde'],
+        'spectra': dict(zip(qs, [{name: first[name] for name in Q_RESULTS}, *spectra]))
+    }
+
+
+def _init_worker(W, stationary, spectrum_options):
+    """
+    Keep W and π in the worker, so they are sent once per worker instead of once per q
+    """
+    _worker_state.update({'W': W, 'stationary': stationary, 'spectrum_options': spectrum_options})
+
+
+def _compute_q_spectrum(q):
+    """
+    L^q_rw, its spectrum and the GFT/IGFT for one q, given the shared π
+    """
+    results = compute_hermitian_random_walk_laplacian(
+        _worker_state['W'], q, verbose=False, stationary=_worker_state['stationary'], output_dir=None,
+        **_worker_state['spectrum_options']
+    )
+    return {name: results[name] for name in Q_RESULTS}
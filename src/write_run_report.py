@@ -0,0 +1,30 @@
+import json
+import platform
+from datetime import datetime
+from pathlib import Path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RUN_REPORT_FILE = PROJECT_ROOT / "output" / "run_report.json"
+
+def write_run_report(records, output_file=RUN_REPORT_FILE, metadata=None):
+    """
+    Write the stage records of instrument_stage as a JSON run report
+    Parameters:
+        records: list of stage records
+        output_file: report file
+        metadata: dict of extra run information (parameters, input files)
+    Returns:
+        report: the written report
+    """
+    report = {
+        'finished': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'metadata': metadata or {},
+        'total_wall_s': sum(record['wall_s'] for record in records),
+        'stages': records
+    }
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    return report
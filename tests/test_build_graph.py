@@ -0,0 +1,69 @@
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+import pytest
+from src.build_graph import build_graph
+from src.haversine_distance import haversine_distance
+from src.calculate_bearing import calculate_bearing
+from src.get_angle_segment import get_angle_segment
+
+
+def scalar_build_graph(cities, coordinates, radius_km, angle_segment_size, max_radius_km=400):
+    """
+    Pairwise loop build_graph replaced: closest city of every angle segment in the radius band
+    """
+    graph = defaultdict(list)
+    for city1 in cities:
+        lat1, lon1 = coordinates[city1]
+        angle_segments = defaultdict(list)
+        for city2 in cities:
+            if city1 == city2:
+                continue
+            lat2, lon2 = coordinates[city2]
+            distance = haversine_distance(lat1, lon1, lat2, lon2)
+            if radius_km < distance <= max_radius_km:
+                bearing = calculate_bearing(lat1, lon1, lat2, lon2)
+                angle_segments[get_angle_segment(bearing, angle_segment_size)].append((city2, distance, bearing))
+        for segment, candidates in angle_segments.items():
+            candidates.sort(key=lambda x: x[1])
+            closest_city, distance, bearing = candidates[0]
+            graph[city1].append({'city': closest_city, 'distance': distance, 'bearing': bearing, 'segment': segment})
+    return graph
+
+
+def random_cities(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    cities = [f"c{i}" for i in range(n)]
+    coordinates = {city: (rng.uniform(8, 30), rng.uniform(70, 90)) for city in cities}
+    return pd.DataFrame({'District': cities}), coordinates
+
+
+def assert_same_graph(graph, expected):
+    assert list(graph) == list(expected)
+    for city, edges in expected.items():
+        assert [(edge['city'], edge['segment']) for edge in graph[city]] == \
+               [(edge['city'], edge['segment']) for edge in edges], city
+        np.testing.assert_allclose([edge['distance'] for edge in graph[city]],
+                                   [edge['distance'] for edge in edges], rtol=1e-9)
+        np.testing.assert_allclose([edge['bearing'] for edge in graph[city]],
+                                   [edge['bearing'] for edge in edges], rtol=1e-9)
+
+
+def test_matches_scalar_loop():
+    df, coordinates = random_cities()
+    expected = scalar_build_graph(list(coordinates), coordinates, radius_km=100, angle_segment_size=20)
+    assert_same_graph(build_graph(df, coordinates, radius_km=100, angle_segment_size=20), expected)
+
+
+@pytest.mark.parametrize('options', [
+    {'use_spatial_index': False},
+    {'use_spatial_index': False, 'chunk_size': 7},
+    {'use_spatial_index': True, 'chunk_size': 7},
+    {'use_spatial_index': True, 'max_radius_km': 250},
+])
+def test_chunking_and_spatial_index_match_scalar_loop(options):
+    df, coordinates = random_cities(seed=1)
+    expected = scalar_build_graph(list(coordinates), coordinates, radius_km=50, angle_segment_size=15,
+                                  max_radius_km=options.get('max_radius_km', 400))
+    graph = build_graph(df, coordinates, radius_km=50, angle_segment_size=15, **options)
+    assert_same_graph(graph, expected)
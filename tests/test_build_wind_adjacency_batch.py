@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from src.build_graph import build_graph
+from src.build_wind_adjacency_matrix import build_wind_adjacency_matrix
+from src.build_wind_adjacency_batch import build_wind_adjacency_batch
+
+
+def test_every_snapshot_matches_build_wind_adjacency_matrix():
+    rng = np.random.default_rng(0)
+    n, T = 60, 8
+    cities = [f"c{i}" for i in range(n)]
+    coordinates = {city: (rng.uniform(20, 26), rng.uniform(75, 81)) for city in cities}
+    graph = build_graph(pd.DataFrame({'District': cities}), coordinates, radius_km=50, angle_segment_size=20)
+
+    speeds = rng.choice([0.0, 1.5, 3.2, 7.8], size=(T, n))
+    directions = rng.uniform(0, 360, size=(T, n))
+    # Cities without a reading in a snapshot
+    directions[rng.random((T, n)) < 0.2] = np.nan
+    speeds[np.isnan(directions)] = np.nan
+
+    adj_batch, batch_cities = build_wind_adjacency_batch(graph, cities, speeds, directions, angle_segment_size=20)
+    assert batch_cities == cities and adj_batch.nnz > 0
+    for t in range(T):
+        reading = ~np.isnan(directions[t])
+        df = pd.DataFrame({
+            'District': np.array(cities)[reading],
+            'Speed (in m/s)': speeds[t, reading],
+            'Direction (in ° angle)': directions[t, reading],
+        })
+        adj_matrix, _ = build_wind_adjacency_matrix(df, graph, coordinates, angle_segment_size=20, sparse=True)
+        np.testing.assert_array_equal(adj_batch[t * n:(t + 1) * n].toarray(), adj_matrix.toarray(), err_msg=f"snapshot {t}")
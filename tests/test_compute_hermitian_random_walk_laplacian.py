@@ -0,0 +1,65 @@
+import numpy as np
+import scipy.sparse as sp
+import pytest
+from src.compute_hermitian_random_walk_laplacian import (
+    compute_hermitian_random_walk_laplacian, compute_stationary_distribution
+)
+
+
+def random_wind_adjacency(n=40, density=0.1, seed=0):
+    """
+    Directed weighted adjacency with a ring, so that every node has an out-edge
+    """
+    rng = np.random.default_rng(seed)
+    W = sp.random(n, n, density=density, random_state=rng, data_rvs=lambda size: rng.uniform(0.5, 10, size))
+    ring = sp.csr_matrix((rng.uniform(0.5, 10, n), (np.arange(n), (np.arange(n) + 1) % n)), shape=(n, n))
+    W = (W + ring).tolil()
+    W.setdiag(0)
+    return W.tocsr()
+
+
+@pytest.mark.parametrize('q', [0.01, 0.25])
+def test_sparse_matches_dense(q):
+    W = random_wind_adjacency()
+    dense = compute_hermitian_random_walk_laplacian(W.toarray(), q, verbose=False, output_dir=None)
+    sparse = compute_hermitian_random_walk_laplacian(W, q, verbose=False, output_dir=None)
+
+    for name in ('L_hrw', 'P', 'Pi', 'P_tilde', 'P_tilde_hermitian'):
+        np.testing.assert_allclose(sparse[name].toarray(), dense[name], atol=1e-12, err_msg=name)
+    np.testing.assert_allclose(sparse['stationary_distribution'], dense['stationary_distribution'], atol=1e-12)
+    np.testing.assert_allclose(sparse['eigenvalues'], dense['eigenvalues'], atol=1e-10)
+    assert sparse['is_hermitian'] and dense['is_hermitian']
+
+    # Gamma_q agrees on the pattern of W + W^T, the only entries the sparse one defines
+    pattern = ((W + W.T) > 0).toarray()
+    np.testing.assert_allclose(sparse['Gamma_q'].toarray()[pattern], dense['Gamma_q'][pattern], atol=1e-12)
+
+
+def test_partial_spectrum_falls_back_when_arpack_does_not_converge():
+    W = random_wind_adjacency(n=200, density=0.02)
+    full = compute_hermitian_random_walk_laplacian(W, verbose=False, output_dir=None)
+    partial = compute_hermitian_random_walk_laplacian(W, verbose=False, output_dir=None, k=6, eigsh_max_iter=1)
+
+    assert partial['spectrum_info']['fallback_from'] == 'eigsh'
+    assert partial['spectrum_info']['converged']
+    np.testing.assert_allclose(partial['eigenvalues'], full['eigenvalues'][:6], atol=1e-6)
+
+
+def test_stationary_distribution_of_chain_with_dangling_nodes():
+    # Cycle 0 -> 1 -> 2 -> 0 fed by 3 and 4, node 5 is dangling
+    W = sp.csr_matrix((np.ones(6), ([0, 1, 2, 3, 4, 3], [1, 2, 0, 0, 5, 4])), shape=(6, 6))
+    P = sp.diags(1 / np.maximum(np.asarray(W.sum(axis=1)).ravel(), 1)) @ W
+
+    pi, info = compute_stationary_distribution(P)
+    pi_eig, _ = compute_stationary_distribution(P, method='eig')
+    assert info['converged']
+    np.testing.assert_allclose(pi, pi_eig, atol=1e-8)
+    np.testing.assert_allclose(P.T @ pi, pi, atol=1e-8)
+
+    # Opt-in redistribution changes the chain: once the cycle leaks into the dangling
+    # node, π is no longer stationary for P
+    W = sp.csr_matrix((np.ones(5), ([0, 1, 2, 2, 3], [1, 2, 0, 5, 0])), shape=(6, 6))
+    P = sp.diags(1 / np.maximum(np.asarray(W.sum(axis=1)).ravel(), 1)) @ W
+    pi_redistributed, info = compute_stationary_distribution(P, redistribute_dangling=True)
+    assert info['converged']
+    assert np.abs(P.T @ pi_redistributed - pi_redistributed).sum() > 1e-3
@@ -0,0 +1,40 @@
+import pandas as pd
+from src.load_gazetteer import load_gazetteer
+from src.geocode_with_gazetteer import geocode_with_gazetteer
+
+
+def write_gazetteer(tmp_path, rows):
+    gazetteer_file = tmp_path / "gazetteer.csv"
+    pd.DataFrame(rows, columns=['name', 'state', 'lat', 'lon']).to_csv(gazetteer_file, index=False)
+    return load_gazetteer(gazetteer_file)
+
+
+def test_urban_and_rural_districts_stay_apart(tmp_path):
+    gazetteer = write_gazetteer(tmp_path, [
+        ("Bangalore Urban", "Karnataka", 12.97, 77.59),
+        ("Bangalore Rural", "Karnataka", 13.2, 77.7),
+        ("Pune", "Maharashtra", 18.52, 73.86),
+    ])
+    df = pd.DataFrame({
+        'District': ["Bangalore Urban", "Bangalore Rural", "Bangalore", "Pune Dist."],
+        'State': ["Karnataka", "Karnataka", "Karnataka", "Maharashtra"],
+    })
+
+    resolved, unresolved = geocode_with_gazetteer(df, gazetteer)
+    assert resolved[("Bangalore Urban", "Karnataka")] == (12.97, 77.59)
+    assert resolved[("Bangalore Rural", "Karnataka")] == (13.2, 77.7)
+    # Suffix words are only dropped when that still names a single place
+    assert resolved[("Pune Dist.", "Maharashtra")] == (18.52, 73.86)
+    assert unresolved == [("Bangalore", "Karnataka")]
+
+
+def test_shared_name_resolves_within_its_state(tmp_path):
+    gazetteer = write_gazetteer(tmp_path, [
+        ("Aurangabad", "Maharashtra", 19.88, 75.34),
+        ("Aurangabad", "Bihar", 24.75, 84.37),
+    ])
+    df = pd.DataFrame({'District': ["Aurangabad", "Aurangabad"], 'State': ["Bihar", "Unknown"]})
+
+    resolved, unresolved = geocode_with_gazetteer(df, gazetteer)
+    assert resolved == {("Aurangabad", "Bihar"): (24.75, 84.37)}
+    assert unresolved == [("Aurangabad", "Unknown")]
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.incremental_wind_graph import IncrementalWindGraph
+from src.build_graph import build_graph
+from src.build_wind_adjacency_matrix import build_wind_adjacency_matrix
+
+PARAMS = {'radius_km': 50, 'angle_segment_size': 30, 'max_radius_km': 400, 'wind_segment_size': 30}
+
+
+def random_place(rng):
+    return rng.uniform(20, 26), rng.uniform(75, 81)
+
+
+def random_reading(rng):
+    # Some cities have no reading, a few a reading without a speed
+    if rng.random() < 0.2:
+        return None, None
+    speed = None if rng.random() < 0.1 else round(rng.uniform(0, 10), 1)
+    return speed, rng.uniform(0, 360)
+
+
+def rebuild(incremental):
+    """
+    build_graph and build_wind_adjacency_matrix over the incremental graph's cities
+    """
+    cities = incremental.cities
+    coordinates = {city: incremental.coordinates[city] for city in cities}
+    readings = [city for city in cities if incremental.directions.get(city) is not None]
+    wind = pd.DataFrame({
+        'District': readings,
+        'Speed (in m/s)': [np.nan if incremental.speeds[city] is None else incremental.speeds[city]
+                           for city in readings],
+        'Direction (in ° angle)': [incremental.directions[city] for city in readings],
+    })
+    graph = build_graph(pd.DataFrame({'District': cities}), coordinates, radius_km=PARAMS['radius_km'],
+                        angle_segment_size=PARAMS['angle_segment_size'], max_radius_km=PARAMS['max_radius_km'])
+    adj_matrix, _ = build_wind_adjacency_matrix(wind, graph, coordinates,
+                                                angle_segment_size=PARAMS['wind_segment_size'])
+    return graph, adj_matrix
+
+
+def assert_matches_rebuild(incremental):
+    graph, adj_matrix = rebuild(incremental)
+    assert {city: edges for city, edges in incremental.graph.items()} == dict(graph)
+    np.testing.assert_array_equal(incremental.adjacency_matrix(sparse=False)[0], adj_matrix)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_random_updates_match_full_rebuild(seed):
+    rng = np.random.default_rng(seed)
+    coordinates, speeds, directions = {}, {}, {}
+    for i in range(30):
+        coordinates[f"c{i}"] = random_place(rng)
+        speed, direction = random_reading(rng)
+        if direction is not None:
+            speeds[f"c{i}"], directions[f"c{i}"] = speed, direction
+    incremental = IncrementalWindGraph(coordinates, speeds, directions, **PARAMS)
+    assert_matches_rebuild(incremental)
+
+    next_city = len(coordinates)
+    for _ in range(60):
+        operation = rng.choice(['add', 'remove', 'update'])
+        if operation == 'add' or len(incremental.cities) < 5:
+            incremental.add_city(f"c{next_city}", *random_place(rng), *random_reading(rng))
+            next_city += 1
+        elif operation == 'remove':
+            incremental.remove_city(rng.choice(incremental.cities))
+        else:
+            speed, direction = random_reading(rng)
+            incremental.update_wind(rng.choice(incremental.cities), speed, direction or 0.0)
+        assert_matches_rebuild(incremental)
+
+
+def test_missing_speed_never_gives_an_outgoing_edge():
+    # Cities 1 degree of longitude (about 100 km) apart along a parallel
+    coordinates = {'c0': (22.0, 78.0), 'c1': (22.0, 79.0), 'c2': (22.0, 80.0)}
+    incremental = IncrementalWindGraph(coordinates, **PARAMS)
+
+    incremental.add_city('c3', 22.0, 77.0, speed=None, direction=60.0)
+    incremental.update_wind('c2', np.nan, 280.0)
+    adj_matrix, cities = incremental.adjacency_matrix(sparse=False)
+    assert np.isnan(adj_matrix[cities.index('c0'), cities.index('c3')])
+    assert np.isnan(adj_matrix[cities.index('c1'), cities.index('c2')])
+    assert not any(incremental.owners.values())
+    assert_matches_rebuild(incremental)